@@ -15,8 +15,16 @@
 # ******************************************************************************
 from __future__ import print_function, absolute_import
 import logging
+import threading
 
+import numpy as np
 from builtins import object
+try:
+    # Python 2
+    from Queue import Queue, Empty, Full
+except ImportError:
+    # Python 3
+    from queue import Queue, Empty, Full
 
 import ngraph as ng
 from ngraph.op_graph.op_graph import InputOp
@@ -25,13 +33,13 @@ logger = logging.getLogger(__name__)
 try:
     from aeon import DataLoader
 except ImportError:
-    msg = "\n".join(["",
-                     "Unable to import Aeon module.",
-                     "Please see installation instructions at:",
-                     "*****************",
-                     "https://github.com/NervanaSystems/aeon/blob/rc1-master/README.md",
-                     "*****************",
-                     ""])
+    msg = """
+Unable to import Aeon module.
+Please see installation instructions at:
+*****************
+https://github.com/NervanaSystems/aeon/blob/rc1-master/README.md
+*****************
+"""
     logger.error(msg)
     raise ImportError(msg)
 
@@ -41,23 +49,164 @@ NAME_MAP = {"channels": "C",
             "frames": "D"}
 """Converts aeon axis names to canonical ngraph axis types."""
 
+_POLL_SECONDS = 0.1
+
+
+class _BatchBuffers(object):
+    """
+    Ring of preallocated output buffers that aeon batches are copied into, so that
+    no arrays are allocated per batch. Buffers are sized from the first batch.
+
+    Arguments:
+        count (int): number of buffer sets to rotate through. A returned batch stays
+            valid until `count - 1` further batches have been processed.
+        copy_all (bool): copy every array out of aeon's buffers, which aeon may reuse for
+            subsequent batches. If False aeon's buffers are returned, with the label
+            flattened in place.
+    """
+
+    def __init__(self, count, copy_all=True):
+        self._buffers = [dict() for _ in range(count)]
+        self._index = 0
+        self.copy_all = copy_all
+
+    def __call__(self, bufs):
+        out = self._buffers[self._index]
+        self._index = (self._index + 1) % len(self._buffers)
+        bufs_dict = dict()
+        for key, val in bufs:
+            shape = (val.size,) if key == 'label' else val.shape
+            if not self.copy_all:
+                # reshape is a view of aeon's contiguous buffer, no copy is made
+                bufs_dict[key] = val.reshape(shape)
+                continue
+            buf = out.get(key)
+            if buf is None or buf.shape != shape or buf.dtype != val.dtype:
+                buf = out[key] = np.empty(shape, dtype=val.dtype)
+            np.copyto(buf, val.reshape(shape))
+            bufs_dict[key] = buf
+        return bufs_dict
+
+
+class _PrefetchIterator(object):
+    """
+    Pulls batches from an aeon DataLoader in a background thread so that
+    fetching and decoding the next batches overlaps with the consumer.
+
+    Arguments:
+        dataloader: aeon DataLoader to pull batches from.
+        process: callable applied to every raw batch in the worker thread.
+        depth (int): maximum number of batches buffered ahead of the consumer.
+    """
+    _END = object()
+
+    def __init__(self, dataloader, process, depth):
+        self._dataloader = dataloader
+        self._process = process
+        self._depth = depth
+        self._start()
+
+    def _start(self):
+        self._queue = Queue(maxsize=self._depth)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._worker)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=_POLL_SECONDS)
+                return True
+            except Full:
+                continue
+        return False
+
+    def _worker(self):
+        while not self._stop.is_set():
+            try:
+                item = self._process(next(self._dataloader))
+            except StopIteration:
+                self._put(self._END)
+                return
+            except Exception as e:
+                # Re-raised in the consumer thread
+                self._put(e)
+                return
+            if not self._put(item):
+                return
+
+    def __next__(self):
+        item = self._queue.get()
+        if item is self._END:
+            # Keep raising StopIteration on further calls
+            self._queue.put(item)
+            raise StopIteration
+        if isinstance(item, Exception):
+            # Keep raising the worker's error on further calls
+            self._queue.put(item)
+            raise item
+        return item
+
+    def close(self):
+        """
+        Stops the worker thread and discards any prefetched batches.
+        """
+        self._stop.set()
+        while self._thread.is_alive():
+            try:
+                self._queue.get(timeout=_POLL_SECONDS)
+            except Empty:
+                pass
+        self._thread.join()
+
+    def reset(self):
+        """
+        Discards prefetched batches, resets the underlying dataloader and
+        restarts prefetching from the beginning of the dataset.
+        """
+        self.close()
+        self._dataloader.reset()
+        self._start()
+
 
 class AeonDataLoader(object):
+    """
+    Thin wrapper around the aeon DataLoader that returns dictionaries of batch buffers.
+
+    Batches are copied into preallocated buffers that are reused, so the arrays returned
+    by __next__ are only valid until the next call. Copy them to hold on to a batch.
+
+    Arguments:
+        config (dict): aeon configuration.
+        prefetch_depth (int, keyword only): number of batches fetched ahead in a
+            background thread. Defaults to 0, which fetches batches synchronously in
+            __next__. Leave prefetching off for remote shared sessions, since the
+            batches fetched ahead are dropped on reset.
+    """
 
     def __init__(self, config, *args, **kwargs):
+        prefetch_depth = kwargs.pop('prefetch_depth', 0)
         self.config = config
         self._dataloader = DataLoader(config)
         self.session_id = self._dataloader.session_id
         self.ndata = self._dataloader.ndata
         if self.ndata < self._dataloader.batch_size:
             raise ValueError('Number of examples is smaller than the batch size')
+        self._prefetcher = None
+        if prefetch_depth > 0:
+            # One buffer set is being filled by the worker, prefetch_depth are queued and
+            # one is held by the consumer
+            self._buffers = _BatchBuffers(prefetch_depth + 2, copy_all=True)
+            self._prefetcher = _PrefetchIterator(self._dataloader, self._buffers,
+                                                 prefetch_depth)
+        else:
+            self._buffers = _BatchBuffers(1, copy_all=False)
 
     def __next__(self):
-        bufs = next(self._dataloader)
-        bufs_dict = dict((key, val) for key, val in bufs)
-        if 'label' in bufs_dict:
-            bufs_dict['label'] = bufs_dict['label'].flatten()
-        return bufs_dict
+        if self._prefetcher is not None:
+            return next(self._prefetcher)
+        return self._buffers(next(self._dataloader))
 
     def __iter__(self):
         return self
@@ -66,13 +215,12 @@ class AeonDataLoader(object):
         placeholders = {}
         batch_axis = ng.make_axis(self._dataloader.batch_size, name="N")
         for placeholder_name, axis_info in self._dataloader.axes_info:
-            p_axes = ng.make_axes([batch_axis])
-            for nm, sz in axis_info:
-                if placeholder_name == 'label':
-                    continue
-                if nm in NAME_MAP:
-                    nm = NAME_MAP[nm]
-                p_axes += ng.make_axis(name=nm, length=sz)
+            p_axes = [batch_axis]
+            # Labels are flattened to the batch axis in __next__
+            if placeholder_name != 'label':
+                p_axes += [ng.make_axis(name=NAME_MAP.get(nm, nm), length=sz)
+                           for nm, sz in axis_info]
+            p_axes = ng.make_axes(p_axes)
             placeholders[placeholder_name] = ng.placeholder(p_axes)
         if include_iteration:
             placeholders['iteration'] = ng.placeholder(axes=())
@@ -80,7 +228,7 @@ class AeonDataLoader(object):
 
     def make_input_ops(self, address, port, batch_axis, device, device_id):
         use_placeholder = (address is None and port is None)
-        logger.debug("make_input_ops: session_id = " + str(self.session_id))
+        logger.debug("make_input_ops: session_id = %s", self.session_id)
 
         # Setup aeon datloader config for worker
         config_worker = {'remote': {'address': address, 'port': port,
@@ -111,7 +259,10 @@ class AeonDataLoader(object):
         return input_ops
 
     def reset(self):
-        self._dataloader.reset()
+        if self._prefetcher is not None:
+            self._prefetcher.reset()
+        else:
+            self._dataloader.reset()
 
     def ndata(self):
         self._dataloader.ndata
@@ -18,7 +18,6 @@ from __future__ import division
 import uuid
 import collections
 import operator
-import itertools
 from functools import reduce, wraps
 from frozendict import frozendict
 
@@ -869,15 +868,14 @@ class Axes(object):
         Returns:
             List of Axis objects
         """
-        axes_list = [list(axis.axes) if axis.is_flattened else [axis]
-                     for axis in axes]
-        axes = list(itertools.chain.from_iterable(axes_list))
-
-        # inflate recursively
-        if any([axis.is_flattened for axis in axes]):
-            return Axes.as_flattened_list(axes)
-        else:
-            return axes
+        flattened_list = []
+        for axis in axes:
+            if axis.is_flattened:
+                # inflate recursively
+                flattened_list.extend(Axes.as_flattened_list(axis.axes))
+            else:
+                flattened_list.append(axis)
+        return flattened_list
 
 
 class DuplicateAxisNames(ValueError):
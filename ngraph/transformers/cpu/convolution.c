@@ -17,12 +17,24 @@
 #include "mkldnn_engine.h"
 #include "mkldnn_util.h"
 
+/* Filter layout for a passed memory descriptor. The passed descriptors can be shared
+ * between tensors, so the format is adjusted on a copy */
+static mkldnn_memory_desc_t get_weights_md(const mkldnn_memory_desc_t* md) {
+  mkldnn_memory_desc_t weights_md = *md;
+  // MKL prefers ihwo nomenclature for filter layouts. chwn an ihwo are equivalent
+  if (weights_md.format == mkldnn_chwn) weights_md.format = mkldnn_ihwo;
+  // Filters have no canned format for nhwc. Keep its strides as a blocked layout
+  if (weights_md.format == mkldnn_nhwc) weights_md.format = mkldnn_blocked;
+  return weights_md;
+}
+
 void create_mkldnn_conv_fprop_kernel(mkldnn_engine_t engine, int src_dims,
                                      int weights_dims, int bias_dims, int dst_dims,
                                      int* src_sizes, int* weights_sizes, int* bias_sizes,
                                      int* dst_sizes, int* strides, int* padding, int* dilates,
                                      mkldnn_memory_desc_t* input_src_md,
                                      mkldnn_memory_desc_t* input_weights_md,
+                                     int fuse_relu,
                                      mkldnn_data_type_t data_type,
                                      mkldnn_opkernel_t opkernel) {
   // Create an optimized convolution kernel
@@ -59,8 +71,24 @@ void create_mkldnn_conv_fprop_kernel(mkldnn_engine_t engine, int src_dims,
       mkldnn_padding_zero));
   }
 
-  MKL_CHECK(mkldnn_primitive_desc_create(&opkernel->op_desc, &conv_desc, engine,
-                                         NULL));
+  // Optionally apply a ReLU to the destination as a post-op so the
+  // activation runs while the output tile is still in cache
+  mkldnn_primitive_attr_t attr = NULL;
+  if (fuse_relu) {
+    mkldnn_post_ops_t post_ops;
+    MKL_CHECK(mkldnn_post_ops_create(&post_ops));
+    MKL_CHECK(mkldnn_post_ops_append_eltwise(post_ops, 1.0, mkldnn_eltwise_relu,
+                                             0.0, 0.0));
+    MKL_CHECK(mkldnn_primitive_attr_create(&attr));
+    MKL_CHECK(mkldnn_primitive_attr_set_post_ops(attr, post_ops));
+    MKL_CHECK(mkldnn_post_ops_destroy(post_ops));
+  }
+
+  MKL_CHECK(mkldnn_primitive_desc_create_v2(&opkernel->op_desc, &conv_desc,
+                                            attr, engine, NULL));
+  if (attr) {
+    MKL_CHECK(mkldnn_primitive_attr_destroy(attr));
+  }
 
   const_mkldnn_primitive_desc_t kernel_src_pd =
       mkldnn_primitive_desc_query_pd(opkernel->op_desc, mkldnn_query_src_pd, 0);
@@ -84,9 +112,8 @@ void create_mkldnn_conv_fprop_kernel(mkldnn_engine_t engine, int src_dims,
                          &(opkernel->inputs[0]));
   }
   if (input_weights_md) {
-    // MKL prefers ihwo nomenclature for filter layouts. chwn an ihwo are equivalent
-    if (input_weights_md->format == mkldnn_chwn) input_weights_md->format = mkldnn_ihwo;
-    create_mkldnn_tensor_from_md(weights_dims, weights_sizes, input_weights_md, engine,
+    mkldnn_memory_desc_t weights_md = get_weights_md(input_weights_md);
+    create_mkldnn_tensor_from_md(weights_dims, weights_sizes, &weights_md, engine,
                                  &(opkernel->inputs[1]));
   } else {
     create_mkldnn_tensor(weights_dims, weights_sizes, data_type, mkldnn_ihwo,
@@ -313,9 +340,8 @@ void create_mkldnn_conv_bprop_data_kernel(
                          &(opkernel->inputs[0]));
   }
   if (input_weights_md) {
-    // MKL prefers ihwo nomenclature for filter layouts. chwn an ihwo are equivalent
-    if (input_weights_md->format == mkldnn_chwn) input_weights_md->format = mkldnn_ihwo;
-    create_mkldnn_tensor_from_md(weights_dims, weights_sizes, input_weights_md, engine,
+    mkldnn_memory_desc_t weights_md = get_weights_md(input_weights_md);
+    create_mkldnn_tensor_from_md(weights_dims, weights_sizes, &weights_md, engine,
                                  &(opkernel->inputs[1]));
   } else {
     create_mkldnn_tensor(weights_dims, weights_sizes, data_type, mkldnn_ihwo,
@@ -476,9 +502,8 @@ void create_mkldnn_conv_bprop_weights_kernel(
                          &(opkernel->inputs[1]));
   }
   if (output_weights_md) {
-    // MKL prefers ihwo nomenclature for filter layouts. chwn an ihwo are equivalent
-    if (output_weights_md->format == mkldnn_chwn) output_weights_md->format = mkldnn_ihwo;
-    create_mkldnn_tensor_from_md(weights_dims, weights_sizes, output_weights_md, engine,
+    mkldnn_memory_desc_t weights_md = get_weights_md(output_weights_md);
+    create_mkldnn_tensor_from_md(weights_dims, weights_sizes, &weights_md, engine,
                                  &(opkernel->outputs[0]));
   } else {
     create_mkldnn_tensor(weights_dims, weights_sizes, data_type, mkldnn_ihwo,
@@ -38,10 +38,13 @@ class Mkldnn(object):
             'blocked': 2,
             'nc': 4,
             'nchw': 5,
+            'nhwc': 6,
             'chwn': 7,
         }
         self.kernels = dict()        # MKL Op kernels
         self.native_layouts = []     # Layout objects owned by transformer
+        self.native_layout_cache = dict()   # Maps layout parameters to native layout objects
+        self.tensor_info_cache = dict()     # Maps (td, order) to MKL axes, shape, strides
         try:
             self.mkllib = ct.CDLL(engine_path)
             self.enabled = True
@@ -128,7 +131,8 @@ class Mkldnn(object):
             self.conv_fprop_kernel.argtypes = \
                 [ct.c_void_p, ct.c_int, ct.c_int, ct.c_int, ct.c_int, ct.c_void_p,
                  ct.c_void_p, ct.c_void_p, ct.c_void_p, ct.c_void_p, ct.c_void_p,
-                 ct.c_void_p, ct.c_void_p, ct.c_void_p, ct.c_int, ct.c_void_p]
+                 ct.c_void_p, ct.c_void_p, ct.c_void_p, ct.c_int, ct.c_int,
+                 ct.c_void_p]
             self.conv_bprop_kernel = \
                 self.mkllib.create_mkldnn_conv_bprop_data_kernel
             self.conv_bprop_kernel.argtypes = \
@@ -186,11 +190,15 @@ class Mkldnn(object):
             self.mkldnn_engine_initialized = True
 
     def close(self):
+        # Tensor descriptions reference their ops and buffers, release the graph
+        self.tensor_info_cache.clear()
         if (self.mkldnn_engine_initialized):
             for op in self.kernels:
                 self.delete_opkernel(self.kernels[op])
             for layout in self.native_layouts:
                 self.delete_layout(layout)
+            del self.native_layouts[:]
+            self.native_layout_cache.clear()
             self.destroy_mkldnn_engine_fn(self.mkldnn_engine)
             self.mkldnn_engine_initialized = False
 
@@ -345,10 +353,13 @@ class Mkldnn(object):
             self.set_output_tensor(self.kernels[name], out.ctypes.data, 0)
             self.run_opkernel(self.kernels[name], self.mkldnn_verbose)
         else:
-            if bias is not None:
-                np.add(np.dot(x, y), bias[:, None], out=out)
-            else:
+            # np.dot only writes into C-contiguous outputs of the exact result type
+            if out.flags.c_contiguous and out.dtype == np.result_type(x, y):
                 np.dot(x, y, out=out)
+            else:
+                out[...] = np.dot(x, y)
+            if bias is not None:
+                out += bias[:, None]
 
     def elementwise_add(self, name, I_array1, I_array2, O_array):
         if (self.enabled and name in self.kernels):
@@ -365,7 +376,11 @@ class Mkldnn(object):
             self.set_output_tensor(self.kernels[name], out.ctypes.data, 0)
             self.run_opkernel(self.kernels[name], self.mkldnn_verbose)
         else:
-            np.add(np.maximum(inputs, 0), slope * np.minimum(0, inputs), out=out)
+            if slope == 0:
+                # Plain relu in a single pass without temporaries
+                np.maximum(inputs, 0, out=out)
+            else:
+                np.add(np.maximum(inputs, 0), slope * np.minimum(0, inputs), out=out)
 
     def bprop_relu(self, name, inputs, out, fpropSrc, slope):
         if (self.enabled and name in self.kernels):
@@ -374,8 +389,12 @@ class Mkldnn(object):
             self.set_output_tensor(self.kernels[name], out.ctypes.data, 0)
             self.run_opkernel(self.kernels[name], self.mkldnn_verbose)
         else:
-            np.add(inputs * np.greater(fpropSrc, 0), inputs * slope *
-                   np.less(fpropSrc, 0), out=out)
+            if slope == 0:
+                # Only the mask is a temporary for plain relu
+                np.multiply(inputs, np.greater(fpropSrc, 0), out=out)
+            else:
+                np.add(inputs * np.greater(fpropSrc, 0), inputs * slope *
+                       np.less(fpropSrc, 0), out=out)
 
     def mkl_reorder(self, name, output, input):
         assert self.enabled
@@ -422,6 +441,13 @@ def fprop_lut(lut, idx, axis, output):
     output[:] = lut.take(idx.astype(int), axis)
 
 
+def onehot(x, out):
+    # Scatter ones along the class axis instead of gathering columns of an identity
+    # matrix, which costs the square of the number of classes
+    out.fill(0)
+    out[(x.astype(np.intp),) + np.ix_(*(np.arange(n) for n in x.shape))] = 1
+
+
 def update_lut(error, idx, pad_idx, axis, dW):
     dW[:] = 0
     idx = idx.astype(int)
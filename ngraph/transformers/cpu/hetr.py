@@ -15,6 +15,8 @@
 # ******************************************************************************
 from __future__ import division
 
+import os
+from collections import deque
 import numpy as np
 import mlsl
 from mpi4py import MPI
@@ -24,6 +26,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 USER_TAG = 1
+COMBINED_TAG = 2
+# Sends smaller than this many bytes are combined with the following sends to the same peer
+SEND_COMBINE_BYTES = int(os.environ.get('HETR_SEND_COMBINE_BYTES', 64 * 1024))
 
 
 class HetrLocals(object):
@@ -52,6 +57,8 @@ class HetrLocals(object):
         self.dataloaders = dict()
         self.dataloader_data = dict()
         self.dataloader_trackers = dict()
+        self.pending_sends = dict()
+        self.combined_recvs = dict()
 
         # MLSL-specific
         self.distribution = None
@@ -117,13 +124,56 @@ class HetrLocals(object):
             array = np.atleast_1d(array)
         return np.ctypeslib.as_ctypes(array)
 
-    def mlsl_send(self, send_id, x_nparr):
+    def mlsl_send(self, send_id, x_nparr, flush=True):
+        """
+        Sends x_nparr to the peer of the send op.
+
+        A small send that is not flushed is held back and combined with the following
+        sends to the same peer into a single message, to save the per-message overhead.
+        The code generator only clears flush when the next op is another send to the same
+        peer, so held back arrays are not modified before they are sent.
+        """
         send_op = self.send_nodes[send_id]
-        self.comm.Send(x_nparr, dest=send_op.metadata['peer_id'], tag=USER_TAG)
+        peer_id = send_op.metadata['peer_id']
+        pending = self.pending_sends.setdefault(peer_id, [])
+        if not flush and x_nparr.nbytes < SEND_COMBINE_BYTES:
+            pending.append(x_nparr)
+            return
+        if not pending:
+            self.comm.Send(x_nparr, dest=peer_id, tag=USER_TAG)
+            return
+
+        # Combined message: int64 count and byte sizes, followed by the packed arrays
+        pending.append(x_nparr)
+        header = np.array([len(pending)] + [x.nbytes for x in pending], dtype=np.int64)
+        msg = np.concatenate([header.view(np.uint8)] +
+                             [np.ascontiguousarray(x).reshape(-1).view(np.uint8)
+                              for x in pending])
+        del pending[:]
+        self.comm.Send(msg, dest=peer_id, tag=COMBINED_TAG)
 
     def recv_from_mlsl_send(self, recv_id, out):
         recv_op = self.recv_nodes[recv_id]
-        self.comm.Recv(out, source=recv_op.metadata['peer_id'], tag=USER_TAG)
+        peer_id = recv_op.metadata['peer_id']
+        combined = self.combined_recvs.get(peer_id)
+        if not combined:
+            status = MPI.Status()
+            self.comm.Probe(source=peer_id, tag=MPI.ANY_TAG, status=status)
+            if status.Get_tag() != COMBINED_TAG:
+                self.comm.Recv(out, source=peer_id, tag=USER_TAG)
+                return out
+
+            msg = np.empty(status.Get_count(MPI.BYTE), dtype=np.uint8)
+            self.comm.Recv(msg, source=peer_id, tag=COMBINED_TAG)
+            count = int(msg[:8].view(np.int64)[0])
+            offset = 8 * (count + 1)
+            combined = self.combined_recvs[peer_id] = deque()
+            for nbytes in msg[8:offset].view(np.int64):
+                combined.append(msg[offset:offset + nbytes])
+                offset += nbytes
+
+        # Receives from a peer happen in the same order as the peer's sends
+        out[...] = combined.popleft().view(out.dtype).reshape(out.shape)
         return out
 
     def mlsl_gather_send(self, gather_send_id, x_nparr):
@@ -64,6 +64,7 @@ create_mkldnn_layout_descriptor(mkldnn_engine_t engine, int ndims,
   md->data_type = data_type;
   int perm_nc[] = {0, 1};
   int perm_nchw[] = {0, 1, 2, 3};
+  int perm_nhwc[] = {0, 2, 3, 1};
   int perm_chwn[] = {1, 2, 3, 0};
   switch (ndims) {
   case 2:
@@ -84,6 +85,11 @@ create_mkldnn_layout_descriptor(mkldnn_engine_t engine, int ndims,
               fmt = mkldnn_chwn;
           }
       }
+      if (check_axis_order(4, dim_strides, perm_nhwc)) {
+          if (fmt == mkldnn_blocked) {
+              fmt = mkldnn_nhwc;
+          }
+      }
       break;
   }
 
@@ -195,6 +201,10 @@ mkldnn_reorder_axes(mkldnn_memory_desc_t *in_md, int* axis_order) {
     if (mkldnn_compare_memdesc(md, tmp_md)) {
         md->format = mkldnn_chwn;
     }
+    MKL_CHECK(mkldnn_memory_desc_init(tmp_md, md->ndims, md->dims, md->data_type, mkldnn_nhwc));
+    if (mkldnn_compare_memdesc(md, tmp_md)) {
+        md->format = mkldnn_nhwc;
+    }
     if (md->dims[1] >= 8) {
         MKL_CHECK(mkldnn_memory_desc_init(tmp_md, md->ndims, md->dims, md->data_type, mkldnn_nChw8c));
         if (mkldnn_compare_memdesc(md, tmp_md)) {
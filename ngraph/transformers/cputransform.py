@@ -19,6 +19,7 @@ from __future__ import print_function
 
 from functools import wraps
 from operator import itemgetter
+from cachetools import cached, LRUCache
 # These are indirectly used by the generated code
 import numpy as np
 import os
@@ -81,8 +82,8 @@ def align_ndarray(element_count, alignment, dtype):
         return HetrLocals.mlsl_alloc(element_count, alignment, dtype)
     else:
         x = np.empty(element_count + (alignment - 1), dtype)
-        offset = (x.ctypes.data % alignment) // dtype.itemsize
-        padding = 0 if offset == 0 else (alignment - offset)
+        misalignment = x.ctypes.data % alignment
+        padding = 0 if misalignment == 0 else (alignment - misalignment) // dtype.itemsize
         return x[padding:padding + element_count]
 
 
@@ -96,6 +97,19 @@ class CPUConvEngine(object):
         pad_d, pad_h, pad_w = itemgetter(*('pad_' + s for s in ('d', 'h', 'w')))(conv_params)
         str_d, str_h, str_w = itemgetter(*('str_' + s for s in ('d', 'h', 'w')))(conv_params)
         dil_d, dil_h, dil_w = itemgetter(*('dil_' + s for s in ('d', 'h', 'w')))(conv_params)
+        return CPUConvEngine.make_slices(D, H, W, T, R, S, M, P, Q,
+                                         pad_d, pad_h, pad_w,
+                                         str_d, str_h, str_w,
+                                         dil_d, dil_h, dil_w)
+
+    @staticmethod
+    @cached(cache=LRUCache(maxsize=256))
+    def make_slices(D, H, W, T, R, S, M, P, Q,
+                    pad_d, pad_h, pad_w, str_d, str_h, str_w, dil_d, dil_h, dil_w):
+        """
+        Slices only depend on the convolution geometry. They are shared by the many
+        convolutions with the same geometry in a network, and are only read by the kernels.
+        """
         mSlice = [CPUConvEngine.fprop_slice(m, T, D, pad_d, str_d, dil_d) for m in range(M)]
         pSlice = [CPUConvEngine.fprop_slice(p, R, H, pad_h, str_h, dil_h) for p in range(P)]
         qSlice = [CPUConvEngine.fprop_slice(q, S, W, pad_w, str_w, dil_w) for q in range(Q)]
@@ -701,7 +715,7 @@ class CPUCodeGenerator(PyGen):
 
     @generate_op.on_type(OneHotOp)
     def generate_op(self, op, out, x):
-        self.append("{o}[:] = np.eye({o}.shape[0])[:, {x}.astype(np.int32)]", x=x, o=out)
+        self.append("onehot(x={}, out={})", x, out)
 
     @generate_op.on_type(Power)
     def generate_op(self, op, out, x, y):
@@ -766,7 +780,13 @@ class CPUCodeGenerator(PyGen):
             return
         send_id = len(self.send_nodes)
         self.send_nodes.append(op)
-        self.append("self.mlsl_send({}, {})", send_id, arg)
+        # Small sends directly followed by another send to the same peer are
+        # combined into a single message, see HetrLocals.mlsl_send
+        next_exop = self.exop.next_exop
+        flush = next_exop.is_exop_end_of_list or \
+            not isinstance(next_exop.op, CPUMlslSendOp) or \
+            next_exop.op.metadata['peer_id'] != op.metadata['peer_id']
+        self.append("self.mlsl_send({}, {}, flush={})", send_id, arg, flush)
 
     @generate_op.on_type(CPUMlslRecvOp)
     def generate_op(self, op, out):
@@ -902,10 +922,11 @@ class CPUTransformer(ExecutionGraphTransformer):
         # from ngraph.transformers.passes.visualizemem import VisualizeMemPass
         # from ngraph.transformers.passes.dumpgraphpass import DumpGraphPass
 
+        # Cache line aligned tensors, for MKL-DNN and for the vectorized numpy and BLAS loops
+        self.byte_alignment = 64
         self.graph_passes = []
         if self.mkldnn.enabled:
             self.graph_passes += [CPUFusion()]
-            self.byte_alignment = 64
         self.graph_passes += [
             # ExVizPass(view=True, filename="initial"),
             HeTrTensorShaping(),
@@ -1065,7 +1086,7 @@ import numpy.ctypeslib as npct
 import itertools as itt
 from monotonic import monotonic as monotonic
 from ngraph.op_graph import axes
-from ngraph.transformers.cpu.cpuengine import fprop_lut, update_lut
+from ngraph.transformers.cpu.cpuengine import fprop_lut, update_lut, onehot
 from ngraph.transformers.cpu.cpuengine import Mkldnn
 from ngraph.transformers.cpu.cpuengine import ConvLocals
 from ngraph.transformers.cpu.ctc import ctc_cpu
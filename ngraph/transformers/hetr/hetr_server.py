@@ -12,6 +12,7 @@ from ngraph.op_graph.op_graph import Op
 from ngraph.op_graph.serde.serde import protobuf_to_op, pb_to_tensor, tensor_to_protobuf,\
     _deserialize_graph_ops_edges, assign_scalar, protobuf_scalar_to_python, is_scalar_type
 from ngraph.transformers.hetrtransform import build_transformer
+from ngraph.transformers.hetr.hetr_utils import grpc_options
 import logging
 import os
 import fcntl
@@ -217,7 +218,7 @@ def serve():
     args = parser.parse_args()
     comm = MPI.COMM_WORLD
 
-    options = [('grpc.max_send_message_length', -1), ('grpc.max_receive_message_length', -1)]
+    options = grpc_options()
     server = grpc.server(futures.ThreadPoolExecutor(max_workers=1), options=options)
     hetr_pb2_grpc.add_HetrServicer_to_server(HetrServer(comm, server), server)
     logger.debug("server: rank %d, tmpfile %s, ports %s",
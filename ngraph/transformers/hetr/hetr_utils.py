@@ -21,9 +21,30 @@ from ngraph.op_graph.comm_nodes import RecvOp
 from orderedset import OrderedSet
 from ngraph.op_graph.axes import Axes
 import collections
+import os
 import numpy as np
 
 
+# gRPC compression algorithms that can be selected with HETR_GRPC_COMPRESSION
+_GRPC_COMPRESSION_ALGORITHMS = {'none': 0, 'deflate': 1, 'gzip': 2}
+
+
+def grpc_options():
+    """
+    Options for the hetr gRPC channels and servers: unlimited message sizes, and no
+    compression unless HETR_GRPC_COMPRESSION selects 'gzip' or 'deflate'. Compression
+    applies to every call, including the per-step tensor transfers that are mostly
+    float data, so it only pays off on slow links.
+    """
+    compression = os.environ.get('HETR_GRPC_COMPRESSION', 'none').lower()
+    if compression not in _GRPC_COMPRESSION_ALGORITHMS:
+        raise ValueError("unknown HETR_GRPC_COMPRESSION {}, expected one of {}"
+                         .format(compression, sorted(_GRPC_COMPRESSION_ALGORITHMS)))
+    return [('grpc.max_send_message_length', -1),
+            ('grpc.max_receive_message_length', -1),
+            ('grpc.default_compression_algorithm', _GRPC_COMPRESSION_ALGORITHMS[compression])]
+
+
 def get_iterable(x):
     if isinstance(x, collections.Iterable) and not isinstance(x, str):
         return x
@@ -5,6 +5,7 @@ from . import hetr_pb2
 from . import hetr_pb2_grpc
 from ngraph.op_graph.serde.serde import op_to_protobuf, tensor_to_protobuf,\
     pb_to_tensor, is_scalar_type, assign_scalar, protobuf_scalar_to_python
+from ngraph.transformers.hetr.hetr_utils import grpc_options
 import logging
 
 
@@ -22,6 +23,7 @@ class RPCComputationClient(object):
         self.comp_id = comp_id
         self.RPC = stub
         self.feed_input_response_future = None
+        self.get_results_response_future = None
 
     def feed_input(self, values):
         logger.debug("client: feed input")
@@ -39,17 +41,39 @@ class RPCComputationClient(object):
                 values=pb_values),
             _TIMEOUT_SECONDS)
 
-    def get_results(self):
-        logger.debug("client: get results")
+    def request_results(self):
+        """
+        Waits for feed_input to finish and sends the get_results request asynchronously,
+        so that results of several computations can be fetched concurrently.
+        """
+        logger.debug("client: request results")
         if self.feed_input_response_future is None:
             raise RuntimeError("call feed_input before get_results")
         response = self.feed_input_response_future.result()
         self.feed_input_response_future = None
         if not response.status:
             raise RuntimeError("RPC feed_input request failed: {}".format(response.message))
-        response = self.RPC.GetResults(
+        self.get_results_response_future = self.RPC.GetResults.future(
             hetr_pb2.GetResultsRequest(comp_id=self.comp_id),
             _TIMEOUT_SECONDS)
+
+    def get_results(self):
+        return_list = self.get_results_list()
+        return_dict = {op: return_list[mypos]
+                       for (op, mypos) in iteritems(self.returns)}
+        return return_dict
+
+    def get_results_list(self):
+        """
+        Waits for the results of the computation.
+
+        :return: list of results, indexed by the positions in self.returns
+        """
+        logger.debug("client: get results")
+        if self.get_results_response_future is None:
+            self.request_results()
+        response = self.get_results_response_future.result()
+        self.get_results_response_future = None
         if not response.status:
             raise RuntimeError("RPC get_results request failed: {}".format(response.message))
         return_list = []
@@ -58,9 +82,7 @@ class RPCComputationClient(object):
                 return_list.append(protobuf_scalar_to_python(r.scalar))
             else:
                 return_list.append(pb_to_tensor(r.tensor))
-        return_dict = {op: return_list[mypos]
-                       for (op, mypos) in iteritems(self.returns)}
-        return return_dict
+        return return_list
 
 
 class RPCTransformerClient(object):
@@ -89,7 +111,7 @@ class RPCTransformerClient(object):
         if self.is_trans_built:
             logger.debug("client: build_transformer: transformer is already built")
             return
-        options = [('grpc.max_send_message_length', -1), ('grpc.max_receive_message_length', -1)]
+        options = grpc_options()
         channel = grpc.insecure_channel(self.server_address, options=options)
         if not is_channel_ready(channel):
             raise RuntimeError("gRPC channel is not ready...")
@@ -112,7 +134,7 @@ class RPCTransformerClient(object):
             self.is_trans_built = False
             raise RuntimeError("RPC build_transformer request failed: {}".format(response.message))
 
-    def create_computation(self, pb_graph, returns, placeholders):
+    def create_computation(self, pb_graph, returns, placeholders, serialize_op=op_to_protobuf):
         logger.debug("client: create_computation")
 
         def make_computation_request(pb_ops, pb_edges, pb_returns=None, pb_placeholders=None):
@@ -128,8 +150,8 @@ class RPCTransformerClient(object):
                     edges=pb_edges)
 
         def generate_messages():
-            pb_returns = [op_to_protobuf(o) for o in returns]
-            pb_placeholders = [op_to_protobuf(o) for o in placeholders]
+            pb_returns = [serialize_op(o) for o in returns]
+            pb_placeholders = [serialize_op(o) for o in placeholders]
 
             for pb_ops, pb_edges in pb_graph:
                 msg = make_computation_request(
@@ -140,15 +162,35 @@ class RPCTransformerClient(object):
         if not self.is_trans_built:
             raise RuntimeError("call build_transformer before create_computation")
 
+        # pb_graph may still be serialized while it is streamed, so the call has no
+        # deadline. get_computation waits _TIMEOUT_SECONDS for the response instead
         self.computation_response_future = self.RPC.Computation.future(
-            generate_messages(), _TIMEOUT_SECONDS)
+            generate_messages())
+
+    def cancel_computation(self):
+        """
+        Cancels the request of create_computation, e.g. when serializing its graph failed.
+        """
+        logger.debug("client: cancel_computation")
+        if self.computation_response_future is not None:
+            self.computation_response_future.cancel()
+            self.computation_response_future = None
 
     def get_computation(self):
+        """
+        Waits up to _TIMEOUT_SECONDS for the computation, which should be called once the
+        graph passed to create_computation is serialized.
+        """
         logger.debug("client: get_computation")
         if self.computation_response_future is None:
             raise RuntimeError("call create_computation before get_computation")
-        response = self.computation_response_future.result()
-        self.computation_response_future = None
+        try:
+            response = self.computation_response_future.result(_TIMEOUT_SECONDS)
+        except grpc.FutureTimeoutError:
+            self.computation_response_future.cancel()
+            raise
+        finally:
+            self.computation_response_future = None
         if response.comp_id >= 0:
             rpcComputationClient = RPCComputationClient(response.comp_id, self.RPC)
             return rpcComputationClient
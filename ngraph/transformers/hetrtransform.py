@@ -14,7 +14,11 @@
 # limitations under the License.
 # ******************************************************************************
 import collections
+import functools
+import operator
 import os
+import threading
+from concurrent import futures
 
 from orderedset import OrderedSet
 from six import itervalues, iteritems
@@ -30,10 +34,217 @@ from ngraph.transformers.passes.hetrpasses import AxesUpdatePass
 from ngraph.op_graph.serde.serde import op_to_protobuf, add_edges
 import logging
 
+try:
+    from collections.abc import Container, Sequence, Set
+except ImportError:
+    from collections import Container, Sequence, Set
 
-_OPS_PER_MSG = 10
+
+# Serialized ops are sent in messages of about this many bytes, large enough to amortize
+# the per-message overhead of gRPC
+_MSG_TARGET_BYTES = int(os.environ.get('HETR_MSG_TARGET_BYTES', 1 << 20))
 logger = logging.getLogger(__name__)
 
+# Kinds of computation returns, which decide the result type of HetrComputation.__call__
+_RETURNS_NONE, _RETURNS_OP, _RETURNS_SEQUENCE, _RETURNS_SET = range(4)
+
+
+def _cached_op_to_protobuf(pb_cache, op):
+    """
+    Converts op to protobuf, reusing the result of a previous conversion from pb_cache.
+
+    :param pb_cache: dict mapping ops to their protobuf ops
+    :param op: op to serialize
+    :return: protobuf op
+    """
+    pb_op = pb_cache.get(op)
+    if pb_op is None:
+        pb_op = pb_cache[op] = op_to_protobuf(op)
+    return pb_op
+
+
+def _serialize_ops(ops, pb_cache):
+    """
+    Converts ops to protobuf.
+
+    :param ops: list of ops to serialize
+    :param pb_cache: dict mapping ops to their protobuf ops, updated with the results
+    :return: generator of protobuf ops, in the same order as ops
+    """
+    for o in ops:
+        yield _cached_op_to_protobuf(pb_cache, o)
+
+
+def _serialize_graph_chunks(ops, serialized_ops):
+    """
+    Pairs serialized ops with their edges, split into chunks of about _MSG_TARGET_BYTES
+    since gRPC prefers sending smaller messages.
+
+    :param ops: list of ops to send
+    :param serialized_ops: iterable of the protobuf ops of ops, in the same order
+    :return: generator of (pb_ops, pb_edges) tuples
+    """
+    pb_ops, pb_edges = [], []
+    chunk_bytes = 0
+    for i, pb_op in enumerate(serialized_ops):
+        pb_ops.append(pb_op)
+        num_edges = len(pb_edges)
+        add_edges(pb_edges, pb_ops, ops[i])
+        chunk_bytes += pb_op.ByteSize() + sum(e.ByteSize() for e in pb_edges[num_edges:])
+        if chunk_bytes >= _MSG_TARGET_BYTES or i == len(ops) - 1:
+            yield (pb_ops, pb_edges)
+            pb_ops, pb_edges = [], []
+            chunk_bytes = 0
+
+
+class _ChunkStream(object):
+    """
+    Produces chunks in a background thread. Every iteration over the stream yields
+    all chunks in order, blocking until each is produced, so several consumers can
+    start reading before production is complete.
+
+    :param chunks: iterable of chunks to produce
+    """
+
+    def __init__(self, chunks):
+        self._chunks = []
+        self._done = False
+        self._error = None
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._produce, args=(chunks,))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _produce(self, chunks):
+        try:
+            for chunk in chunks:
+                with self._cond:
+                    self._chunks.append(chunk)
+                    self._cond.notify_all()
+        except Exception as e:
+            self._error = e
+        finally:
+            with self._cond:
+                self._done = True
+                self._cond.notify_all()
+
+    def __iter__(self):
+        i = 0
+        while True:
+            with self._cond:
+                while i >= len(self._chunks) and not self._done:
+                    self._cond.wait()
+                if i < len(self._chunks):
+                    chunk = self._chunks[i]
+                elif self._error is not None:
+                    raise self._error
+                else:
+                    return
+            yield chunk
+            i += 1
+
+    def join(self):
+        """
+        Waits for all chunks to be produced, re-raising any error raised by the producer.
+        """
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+
+def _op_references(ops):
+    """
+    Collects the same ops as Op.all_op_references, following the op references anywhere
+    in the __dict__ of the ops, but deduplicates on id() with an iterative worklist.
+
+    :param ops: iterable of root ops
+    :return: dict mapping id() of every referenced op to the op
+    """
+    visited = dict()
+    stack = list(ops)
+    while stack:
+        op = stack.pop()
+        if id(op) in visited:
+            continue
+        visited[id(op)] = op
+        for val in itervalues(op.__dict__):
+            if isinstance(val, Op):
+                stack.append(val)
+            elif isinstance(val, dict):
+                stack.extend(v for v in itervalues(val) if isinstance(v, Op))
+            elif isinstance(val, (list, tuple, set, OrderedSet)):
+                stack.extend(v for v in val if isinstance(v, Op))
+    return visited
+
+
+def _subgraph_chunks(whole_graph, pb_whole_graph, subgraph):
+    """
+    Selects the serialized ops of a subgraph from the serialized whole graph.
+
+    :param whole_graph: list of all ops
+    :param pb_whole_graph: iterable of the protobuf ops of whole_graph, in the same order
+    :param subgraph: ops to send, mapped by id(), a subset of whole_graph
+    :return: generator of (pb_ops, pb_edges) tuples for the ops of subgraph
+    """
+    positions = [i for i, op in enumerate(whole_graph) if id(op) in subgraph]
+    selected = set(positions)
+    serialized_ops = (pb_op for i, pb_op in enumerate(pb_whole_graph) if i in selected)
+    return _serialize_graph_chunks([whole_graph[i] for i in positions], serialized_ops)
+
+
+def _ops_by_transformer(ops):
+    """
+    Groups ops by the child transformers they are placed on.
+
+    :param ops: list of ops with the 'transformer' metadata set by DeviceAssignPass
+    :return: dict mapping transformer name to the list of (position, op) tuples placed on it,
+             in the order of ops
+    """
+    by_transformer = collections.defaultdict(list)
+    for i, op in enumerate(ops):
+        t_names = op.metadata['transformer']
+        if not isinstance(t_names, (list, tuple)):
+            t_names = (t_names,)
+        for t_name in t_names:
+            by_transformer[t_name].append((i, op))
+    return by_transformer
+
+
+def _tuple_getter(indices):
+    """
+    Like operator.itemgetter(*indices), but always returns a tuple, also for fewer
+    than two indices.
+    """
+    if not indices:
+        return lambda values: ()
+    if len(indices) == 1:
+        index = indices[0]
+        return lambda values: (values[index],)
+    return operator.itemgetter(*indices)
+
+
+def _map_result_slots(slot_returns, child_computations):
+    """
+    Maps the result positions of every child computation to the slots of the returned
+    values, stored as the result_slots of each child computation.
+
+    :param slot_returns: list of the returned ops, one per slot
+    :param child_computations: iterable of child computations, whose returns map ops to
+                               their result positions
+    :raises ValueError: if no child computation returns the op of a slot
+    """
+    slots_of = collections.defaultdict(list)
+    for slot, op in enumerate(slot_returns):
+        slots_of[op].append(slot)
+    filled = set()
+    for comp in child_computations:
+        comp.result_slots = [(slot, pos) for op, pos in iteritems(comp.returns)
+                             for slot in slots_of.get(op, ())]
+        filled.update(slot for slot, _ in comp.result_slots)
+    missing = [op for slot, op in enumerate(slot_returns) if slot not in filled]
+    if missing:
+        raise ValueError("No child computation returns {}".format(missing))
+
 
 def build_transformer(name, comm=None):
     """
@@ -72,11 +283,21 @@ class HetrComputation(Computation):
 
         # self.returns could be replaced by comp_op.returns if it were expressed as a set
         self.returns = OrderedSet()
-        if isinstance(computation_op.returns, collections.Container):
+        if isinstance(computation_op.returns, Container):
             self.returns.update(list(computation_op.returns))
         elif isinstance(computation_op.returns, Op):
             self.returns.update(list([computation_op.returns]))
 
+        # decide the result type once, instead of checking the returns type on every call
+        if isinstance(computation_op.returns, Op):
+            self._returns_kind = _RETURNS_OP
+        elif isinstance(computation_op.returns, (list, tuple, OrderedSet, Sequence)):
+            self._returns_kind = _RETURNS_SEQUENCE
+        elif isinstance(computation_op.returns, Set):
+            self._returns_kind = _RETURNS_SET
+        else:
+            self._returns_kind = _RETURNS_NONE
+
         # if one of the requested results is marked as distributed across devices,
         # wrap it in a ResultOp to facilitate DistributedPass inserting a gather operation
         new_returns = OrderedSet()
@@ -92,10 +313,11 @@ class HetrComputation(Computation):
                 new_returns.add(op)
 
         # Do Hetr passes
-        logger.info('Running graph passes'),
-        pass_ops = new_returns | OrderedSet(self.computation_op.parameters)
+        logger.info('Running graph passes')
+        pass_ops = OrderedSet(new_returns)
+        pass_ops.update(self.computation_op.parameters)
         for graph_pass in self.transformer.graph_passes:
-            pass_ops = pass_ops | OrderedSet(hetr.send_nodes)
+            pass_ops.update(hetr.send_nodes)
             graph_pass.do_pass(ops=pass_ops)
 
         # hack around new TensorValueOp that wraps AssignableTensorOp
@@ -104,7 +326,7 @@ class HetrComputation(Computation):
             if isinstance(p, TensorValueOp):
                 p.metadata.update(p.states_read[0].metadata)
 
-        logger.info('Launching child processes'),
+        logger.info('Launching child processes')
         # assume all children are the same type
         # and all GPUs are in one chassis
         num_process = len(self.transformer.child_transformers)
@@ -112,48 +334,65 @@ class HetrComputation(Computation):
         self.transformer.mpilauncher.launch(num_process, ppn)
         self.transformer.setup_child_transformers(num_process)
 
-        def is_my_op(op, name):
-            op_trans = op.metadata['transformer']
-            return name == op_trans or name in op_trans
-
-        logger.info('Serializaing computation graph'),
-        # build whole_graph once to avoid slow serialization once per worker
-        # split whole pb message into list of smaller chunks
-        # gRPC prefers sending smaller messages
+        logger.info('Serializaing computation graph')
+        # serialize whole_graph once to avoid slow serialization once per worker
+        # every worker is sent only the subgraph reachable from its own returns and
+        # placeholders, which includes the send ops linked to its recv ops
+        # ops are streamed to the workers while the rest of the graph is serialized
         placeholders = [p for p in self.computation_op.parameters]
-        all_returns = [o for o in self.send_nodes | new_returns]
+        all_returns = list(self.send_nodes)
+        all_returns.extend(o for o in new_returns if o not in self.send_nodes)
         transform_returns = [o.args[0] if isinstance(o, ResultOp) else o for o in all_returns]
-        whole_graph = Op.all_op_references(transform_returns + placeholders)
-
-        pb_whole_graph = []
-        pb_ops, pb_edges = [], []
-        for i, o in enumerate(whole_graph):
-            pb_ops.append(op_to_protobuf(o))
-            add_edges(pb_edges, pb_ops, o)
-            if (i != 0 and i % _OPS_PER_MSG == 0) or (i == len(whole_graph) - 1):
-                pb_whole_graph.append((pb_ops, pb_edges))
-                pb_ops, pb_edges = [], []
-
+        whole_graph = list(itervalues(_op_references(transform_returns + placeholders)))
+        # returns and placeholders are serialized again for the workers, so protobuf ops
+        # are cached. The cache is only valid until the graph passes of the next computation
+        pb_cache = self.transformer.pb_cache
+        pb_cache.clear()
+        serialize_op = functools.partial(_cached_op_to_protobuf, pb_cache)
+        pb_whole_graph = _ChunkStream(_serialize_ops(whole_graph, pb_cache))
+
+        placeholders_by_trans = _ops_by_transformer(placeholders)
+        returns_by_trans = _ops_by_transformer(all_returns)
         t_placeholders, t_returns = {}, {}
         for t_name in self.transformer.child_transformers.keys():
-            t_placeholders[t_name] = [p for p in placeholders if is_my_op(p, t_name)]
-            t_returns[t_name] = [r for r in all_returns if is_my_op(r, t_name)]
+            t_placeholders[t_name] = [p for _, p in placeholders_by_trans[t_name]]
+            t_returns[t_name] = [r for _, r in returns_by_trans[t_name]]
 
-        # create_computation is an async call using gPRC future
-        # allowing child transformers to create computation simultaneously
-        # get_computation waits the corresponding request to finish
-        logger.info('Creating remote computations'),
-        for t_name, trans in iteritems(self.transformer.child_transformers):
-            logger.debug('child transformer: {}'.format(t_name))
+        def create_computation(t_name, trans):
+            logger.debug('child transformer: %s', t_name)
             trans.build_transformer()
             transform_ops = [
                 r.args[0] if isinstance(r, ResultOp) else r for r in t_returns[t_name]]
-            trans.create_computation(pb_whole_graph, transform_ops, t_placeholders[t_name])
+            subgraph = _op_references(transform_ops + t_placeholders[t_name])
+            pb_graph = _subgraph_chunks(whole_graph, pb_whole_graph, subgraph)
+            trans.create_computation(pb_graph, transform_ops, t_placeholders[t_name],
+                                     serialize_op=serialize_op)
+
+        # build_transformer is a blocking call, so transformers are built from a thread pool
+        # create_computation is an async call using gPRC future
+        # allowing child transformers to create computation simultaneously
+        # get_computation waits the corresponding request to finish
+        logger.info('Creating remote computations')
+        num_children = len(self.transformer.child_transformers)
+        with futures.ThreadPoolExecutor(max_workers=max(num_children, 1)) as executor:
+            pending = [executor.submit(create_computation, t_name, trans)
+                       for t_name, trans in iteritems(self.transformer.child_transformers)]
+            for f in pending:
+                f.result()
+
+        # the computation requests time out from the end of serialization. A serialization
+        # error ends the request streams, which are also cancelled in case they still wait
+        try:
+            pb_whole_graph.join()
+        except Exception:
+            for trans in itervalues(self.transformer.child_transformers):
+                trans.cancel_computation()
+            raise
 
         for t_name, trans in iteritems(self.transformer.child_transformers):
             comp = trans.get_computation()
-            comp.param_idx = [g_pos for g_pos, p in enumerate(self.computation_op.parameters)
-                              if is_my_op(p, t_name)]
+            comp.param_idx = [g_pos for g_pos, _ in placeholders_by_trans[t_name]]
+            comp.get_params = _tuple_getter(comp.param_idx)
 
             # when there is a ResultOp, hack around it
             comp.returns = dict()
@@ -164,6 +403,17 @@ class HetrComputation(Computation):
                     comp.returns[op.metadata['replaces_op']] = i
             self.child_computations[t_name] = comp
 
+        # map the positions of the child results to slots of the returned values once,
+        # so __call__ can fill them without building a dict of results on every call
+        if self._returns_kind == _RETURNS_OP:
+            slot_returns = [computation_op.returns]
+        elif self._returns_kind == _RETURNS_SEQUENCE:
+            slot_returns = list(computation_op.returns)
+        else:
+            slot_returns = []
+        _map_result_slots(slot_returns, itervalues(self.child_computations))
+        self._num_slots = len(slot_returns)
+
     def __call__(self, *args, **kwargs):
         """
         Executes child computations in parallel.
@@ -174,18 +424,28 @@ class HetrComputation(Computation):
         """
         args = self.unpack_args_or_feed_dict(args, kwargs)
         for child in itervalues(self.child_computations):
-            child.feed_input([args[i] for i in child.param_idx])
+            child.feed_input(child.get_params(args))
 
-        return_vals = dict()
+        # fetch results from all children concurrently
         for child in itervalues(self.child_computations):
-            return_vals.update(child.get_results())
+            child.request_results()
 
-        if isinstance(self.computation_op.returns, Op):
-            return return_vals[self.computation_op.returns]
-        elif isinstance(self.computation_op.returns, (collections.Sequence, OrderedSet)):
-            return tuple(return_vals[op] for op in self.computation_op.returns)
-        elif isinstance(self.computation_op.returns, collections.Set):
+        if self._returns_kind == _RETURNS_SET:
+            return_vals = dict()
+            for child in itervalues(self.child_computations):
+                return_vals.update(child.get_results())
             return return_vals
+
+        slots = [None] * self._num_slots
+        for child in itervalues(self.child_computations):
+            results = child.get_results_list()
+            for slot, pos in child.result_slots:
+                slots[slot] = results[pos]
+
+        if self._returns_kind == _RETURNS_OP:
+            return slots[0]
+        elif self._returns_kind == _RETURNS_SEQUENCE:
+            return tuple(slots)
         else:
             return None
 
@@ -212,6 +472,7 @@ class HetrTransformer(ComputationGraphTransformer):
         self.is_closed = False
         self.child_transformers = dict()
         self.send_nodes = OrderedSet()
+        self.pb_cache = dict()
         self.graph_passes = [DeviceAssignPass(hetr=self,
                                               default_device=device,
                                               default_device_id=0),
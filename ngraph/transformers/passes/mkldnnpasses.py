@@ -17,7 +17,8 @@ from __future__ import division
 
 from ngraph.op_graph.convolution import ConvolutionOp, bprop_conv, update_conv
 from ngraph.op_graph.op_graph import Op, MapRolesOp, TensorOp, TensorSliceOp, ExpandDims, \
-    Flatten, Unflatten, ReorderAxes, DotLowDimension, Add, ContiguousOp, ReturnOp
+    Flatten, Unflatten, ReorderAxes, DotLowDimension, Add, ContiguousOp, ReturnOp, \
+    ElementWiseOp
 from ngraph.op_graph.pooling import PoolingOp, BpropPoolOp
 from ngraph.transformers.cpu.batchnorm import BatchnormOp, BpropBatchnormOp
 from ngraph.op_graph.axes import Axes
@@ -25,7 +26,8 @@ from ngraph.transformers.cpu.relu import ReluOp, BpropReluOp
 from ngraph.transformers.passes.passes import PeepholeGraphPass
 from ngraph.util.generics import generic_method
 
-import ctypes as ct
+from cachetools import cached, LRUCache
+from cachetools.keys import hashkey
 import numpy as np
 from operator import itemgetter
 
@@ -48,28 +50,58 @@ class MklReorderOp(TensorOp):
         self.out_layout = out_layout
 
 
+# Extract the (d, h, w) padding, stride and dilation from conv_params or pool_params
+_PAD_GET = itemgetter('pad_d', 'pad_h', 'pad_w')
+_STR_GET = itemgetter('str_d', 'str_h', 'str_w')
+_DIL_GET = itemgetter('dil_d', 'dil_h', 'dil_w')
+
+# Assumes (C, D, H, W, N) for convolution axes and (I, D, H, W, O) for filter axes,
+# which MKL-DNN expects in (N, C, H, W) and (O, I, H, W) order
+_CONV_MKL_ORDER = (4, 0, 2, 3)
+
+
 def get_mkl_order_from_axes_names(input_axis, axis_in_mkl_order):
     axis_name_tuple = input_axis.names
     return [axis_name_tuple.index(axis_name)
             for axis_name in axis_in_mkl_order]
 
 
+def _axes_names_key(axes, sub_axes):
+    return hashkey(tuple(a.name for a in axes), tuple(a.name for a in sub_axes))
+
+
+@cached(cache=LRUCache(maxsize=4096), key=_axes_names_key)
 def get_order_from_axes(axes, sub_axes):
+    """
+    Positions of sub_axes in axes. Only depends on axis names, which are cached since the
+    same layouts recur through relu, add and the layout propagating ops of every layer.
+    The order is returned as a tuple, since every caller gets the same cached object
+    """
+    index_of = {b.name: index for (index, b) in enumerate(axes)}
     order = []
     for a in sub_axes:
-        found = False
-        for (index, b) in enumerate(axes):
-            if b.name == a.name:
-                order.append(index)
-                found = True
-                continue
-        if not found:
+        try:
+            order.append(index_of[a.name])
+        except KeyError:
             assert False, 'Axis {} not found'.format(a)
-    return order
+    return tuple(order)
+
+
+# Interned MKL axes tuples, so equal MKL axes of ops are usually the same object
+_mkl_axes_intern = LRUCache(maxsize=4096)
+
+
+def intern_mkl_axes(mkl_axes):
+    """
+    MKL axes as stored in MKL layouts. Always a tuple, so stored axes compare equal
+    whichever sequence they were built from
+    """
+    mkl_axes = tuple(mkl_axes)
+    return _mkl_axes_intern.setdefault(mkl_axes, mkl_axes)
 
 
 def get_axes_mkl_order(axes, order):
-    return [axes[index] for index in order]
+    return intern_mkl_axes(axes[index] for index in order)
 
 
 def get_size_mkl_order(axes, order):
@@ -80,6 +112,31 @@ def get_strides_mkl_order(td, order):
     return [td.strides[index] for index in order]
 
 
+def get_tensor_info_mkl_order(mkldnn, td, order):
+    '''
+    Axes, sizes and element strides of a tensor in the order in which MKL expects them.
+    Computed once per tensor description and order, since layouts are created for the
+    same tensors by several ops and passes. The results are cached on the engine, which
+    releases the tensor descriptions, and with them the graph, when it is closed
+    :param mkldnn: MKL-DNN engine
+    :param td: tensor description
+    :param order: order in which axes need to be specified to MKL
+    :return: tuple of (mkl_axes, mkl_shape, mkl_strides) tuples
+    '''
+    key = (td, tuple(order))
+    tensor_info = mkldnn.tensor_info_cache.get(key)
+    if tensor_info is None:
+        # Element sizes of the supported types are powers of 2, byte strides are shifted
+        # instead of divided to get element strides
+        elem_shift = td.dtype.itemsize.bit_length() - 1
+        assert td.dtype.itemsize == 1 << elem_shift
+        mkl_axes = tuple(td.axes[index] for index in order)
+        mkl_shape = tuple(a.length for a in mkl_axes)
+        mkl_strides = tuple(td.strides[index] >> elem_shift for index in order)
+        tensor_info = mkldnn.tensor_info_cache[key] = (mkl_axes, mkl_shape, mkl_strides)
+    return tensor_info
+
+
 def get_native_layout(mkldnn, td, order):
     '''
     Create an MKL layout object in transformer-visible layout
@@ -87,15 +144,8 @@ def get_native_layout(mkldnn, td, order):
     :param order: order in which axes need to be specified to MKL
     :return: MKL layout object
     '''
-    op_axes = td.axes
-    mkl_shape = get_size_mkl_order(op_axes, order)
+    mkl_axes, mkl_shape, mkl_strides = get_tensor_info_mkl_order(mkldnn, td, order)
     data_type = mkldnn.datatype[td.dtype.type]
-    elem_size = td.dtype.itemsize
-    mkl_strides = [
-        stride //
-        elem_size for stride in get_strides_mkl_order(
-            td,
-            order)]
     # TODO(jbobba) - Handle views for tensors that are not fully materialized
     assert all(
         (stride != 0 or size == 1) for (
@@ -103,14 +153,19 @@ def get_native_layout(mkldnn, td, order):
             mkl_shape, mkl_strides)), '{} shape: {} strides: {} cannot be handled directly by \
             MKLDNN kernels'.format(
                 td, mkl_shape, mkl_strides)
-    mkl_axes = [axis for axis in get_axes_mkl_order(op_axes, order)]
+    mkl_axes = intern_mkl_axes(mkl_axes)
     memory_format = mkldnn.memory_format['blocked']
 
-    native_layout = mkldnn.create_layout_md(
-        mkldnn.mkldnn_engine,
-        len(mkl_shape), get_ctypes_arg(mkl_shape),
-        get_ctypes_arg(mkl_strides), data_type, memory_format)
-    mkldnn.native_layouts += [native_layout]
+    # Tensors with the same shape, strides and type share one layout object
+    layout_key = (mkl_shape, mkl_strides, data_type, memory_format)
+    native_layout = mkldnn.native_layout_cache.get(layout_key)
+    if native_layout is None:
+        native_layout = mkldnn.create_layout_md(
+            mkldnn.mkldnn_engine,
+            len(mkl_shape), get_ctypes_arg(mkl_shape),
+            get_ctypes_arg(mkl_strides), data_type, memory_format)
+        mkldnn.native_layouts.append(native_layout)
+        mkldnn.native_layout_cache[layout_key] = native_layout
     return (native_layout, mkl_axes)
 
 
@@ -122,30 +177,58 @@ def dbg_print_kernel(mkldnn, op, op_id):
 
 
 def get_ctypes_arg(x):
-    return ((ct.c_int) * len(x))(*x) if x else None
+    """
+    Int array argument for MKL-DNN kernel creation. The array is filled by numpy in C and
+    kept alive by the returned ctypes view for the duration of the call.
+    """
+    return np.asarray(x, dtype=np.intc).ctypes if x else None
+
 
+def get_packed_ctypes_args(*shapes):
+    """
+    Several int array arguments for one MKL-DNN kernel creation, filled into a single
+    array. Returns the array, which the caller keeps alive for the duration of the call,
+    and the addresses of the shapes in it (None for empty shapes).
+    """
+    packed = np.asarray([s for shape in shapes for s in shape], dtype=np.intc)
+    address = packed.ctypes.data
+    addresses = []
+    for shape in shapes:
+        addresses.append(address if len(shape) else None)
+        address += len(shape) * packed.itemsize
+    return packed, addresses
 
+
+@cached(cache=LRUCache(maxsize=1024), key=lambda x: hashkey(tuple(x)))
 def get_flattened_axes(x):
     """
-    Ordered list of axis visible to MKLDNN
+    Ordered tuple of axis visible to MKLDNN. Cached, since the same MKL axes are
+    flattened for every op that uses a rotated layout
     """
-    return Axes.as_flattened_list(x)
+    return tuple(Axes.as_flattened_list(x))
 
 
 def get_rotated_layout(mkldnn, in_layout, from_axes, to_axes):
-    permute_order = [from_axes.index(axis) for axis in to_axes]
+    index_of = {axis: index for (index, axis) in enumerate(from_axes)}
+    permute_order = [index_of[axis] for axis in to_axes]
+    if permute_order == list(range(len(permute_order))):
+        # Axes only differ before flattening, the layout is already in to_axes order
+        return in_layout
     new_layout = mkldnn.layout_reorder(
         in_layout, get_ctypes_arg(permute_order))
-    mkldnn.native_layouts += [new_layout]
+    mkldnn.native_layouts.append(new_layout)
     return new_layout
 
 
 def get_arg_output_idx(exop, arg_exop):
-    for i, output_decl in enumerate(arg_exop.output_decls):
-        for input_decl in output_decl.user_input_decls:
-            if input_decl.exop == exop:
-                # Assumes only arg comes from arg_exop to exop
-                return i
+    # The inputs of exop are few, while arg_exop outputs can have many users
+    for input_decl in exop.input_decls:
+        source_output_decl = input_decl.source_output_decl
+        if source_output_decl.exop is arg_exop:
+            # Assumes only arg comes from arg_exop to exop
+            for i, output_decl in enumerate(arg_exop.output_decls):
+                if output_decl is source_output_decl:
+                    return i
     # TODO(jbobba): assert False?
     return 0
 
@@ -171,11 +254,25 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
         super(MklCreateOpDescriptors, self).__init__(**kwargs)
         assert mkldnn.enabled
         self.mkldnn = mkldnn
+        # Natural axes orders keyed on the number of axes
+        self.natural_orders = dict()
+
+    def get_natural_order(self, axes):
+        """
+        MKL order that keeps the axes as they are, a tuple shared between ops with as many
+        axes
+        """
+        ndims = len(axes)
+        order = self.natural_orders.get(ndims)
+        if order is None:
+            order = self.natural_orders[ndims] = tuple(range(ndims))
+        return order
 
     def begin_pass(self, op_accessor, **kwargs):
         """
-        Computes a dictionary of exops that are control-dependent on a specific exop.
-        This dictionary is used while moving exops in this pass.
+        Computes a dictionary of exops that are control-dependent on a specific exop,
+        and the positions of the exops in the exop list.
+        These dictionaries are used while moving exops in this pass.
         """
         if op_accessor is not None:
             self.op_accessor = op_accessor
@@ -192,6 +289,37 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
                     self.exop_control_deps[exop].add(curr_exop)
                 except KeyError:
                     self.exop_control_deps[exop] = {curr_exop}
+        self.update_exop_positions()
+        # Relu exops folded into the convolution that feeds them, merged in end_pass
+        self.fused_relus = dict()
+
+    def end_pass(self, **kwargs):
+        """
+        Merges the relu exops that were fused into convolution kernels. This is delayed
+        until the end of the pass since the exop iterator may already point at them.
+        """
+        super(MklCreateOpDescriptors, self).end_pass(**kwargs)
+        exop_block = self.op_accessor.exop_block
+        for relu_exop, conv_exop in self.fused_relus.items():
+            if relu_exop in exop_block.root_set:
+                exop_block.root_set.remove(relu_exop)
+                exop_block.root_set.add(conv_exop)
+            exop_block.merge_exop(relu_exop, conv_exop)
+        self.fused_relus = dict()
+
+    def update_exop_positions(self):
+        """
+        Numbers the exops in list order. Moved exops get a position between their new
+        neighbours, so the positions only need to be recomputed when they run out of
+        floating point precision.
+        """
+        self.exop_positions = {exop: float(i)
+                               for i, exop in enumerate(self.op_accessor.exop_block)}
+
+    def get_exop_position(self, exop):
+        if exop not in self.exop_positions:
+            self.update_exop_positions()
+        return self.exop_positions[exop]
 
     def get_exop(self, op):
         return self.op_accessor.computation_decl.get_exop(op)
@@ -200,35 +328,36 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
         exop = self.get_exop(op)
         mkl_layout = self.mkldnn.output_layout(self.mkldnn.kernels[op.safe_name], index)
         exop.output_decls[index].tensor_view_decl.mkl_layout = (
-            mkl_layout, mkl_axes)
+            mkl_layout, intern_mkl_axes(mkl_axes))
 
     def get_arg_mkl_layout(self, op, arg):
-        arg_idx = get_arg_output_idx(self.get_exop(op), self.get_exop(arg))
-        return self.get_exop(arg).output_decls[
-            arg_idx].tensor_view_decl.mkl_layout
+        arg_exop = self.get_exop(arg)
+        arg_idx = get_arg_output_idx(self.get_exop(op), arg_exop)
+        return arg_exop.output_decls[arg_idx].tensor_view_decl.mkl_layout
 
     def get_arg_shape_and_layout(self, op, arg, mkl_order):
-        arg_idx = get_arg_output_idx(self.get_exop(op), self.get_exop(arg))
-        return self.get_op_shape_and_layout(arg, mkl_order, arg_idx)
+        arg_exop = self.get_exop(arg)
+        arg_idx = get_arg_output_idx(self.get_exop(op), arg_exop)
+        return self.get_op_shape_and_layout(arg, mkl_order, arg_idx, arg_exop)
 
-    def get_op_shape_and_layout(self, op, mkl_order, index=0):
-        exop = self.get_exop(op)
+    def get_op_shape_and_layout(self, op, mkl_order, index=0, exop=None):
+        if exop is None:
+            exop = self.get_exop(op)
         mkl_layout = exop.output_decls[index].tensor_view_decl.mkl_layout
-        op_axes_mkl = [op.axes[idx] for idx in mkl_order]
+        op_axes_mkl = get_axes_mkl_order(op.axes, mkl_order)
         mkl_shape = [a.length for a in op_axes_mkl]
         if mkl_layout:
             (in_layout, in_axes) = mkl_layout
             # Check if we need to rotate axes in the MKL layout object
-            if op_axes_mkl != in_axes:
-                assert Axes(
-                    get_flattened_axes(in_axes)).is_equal_set(
-                    Axes(
-                        get_flattened_axes(op_axes_mkl)))
+            if op_axes_mkl is not in_axes and op_axes_mkl != in_axes:
+                in_flat_axes = get_flattened_axes(in_axes)
+                op_flat_axes = get_flattened_axes(op_axes_mkl)
+                assert Axes(in_flat_axes).is_equal_set(Axes(op_flat_axes))
                 mkl_layout = get_rotated_layout(
                     self.mkldnn,
                     in_layout,
-                    get_flattened_axes(in_axes),
-                    get_flattened_axes(op_axes_mkl))
+                    in_flat_axes,
+                    op_flat_axes)
             else:
                 mkl_layout = in_layout
         else:
@@ -253,14 +382,46 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
                 child_exops.add(dep_exop)
 
         for child_exop in child_exops:
-            n_exop = child_exop
-            while n_exop != after_exop and not n_exop.is_exop_end_of_list:
-                n_exop = n_exop.next_exop
-            if n_exop == after_exop and child_exop != after_exop:
+            if child_exop == after_exop:
+                continue
+            after_position = self.get_exop_position(after_exop)
+            if self.get_exop_position(child_exop) < after_position:
+                next_exop = after_exop.next_exop
+                if next_exop.is_exop_end_of_list:
+                    next_position = after_position + 1.0
+                else:
+                    next_position = self.get_exop_position(next_exop)
                 self.op_accessor.exop_block.move_exop_to_after_exop(
                     child_exop, after_exop)
+                position = (after_position + next_position) / 2
+                if after_position < position < next_position:
+                    self.exop_positions[child_exop] = position
+                else:
+                    self.update_exop_positions()
                 self.move_child_exops(child_exop, child_exop)
 
+    def get_fusible_relu(self, op):
+        """
+        Returns the exop of a relu that is the only user of op's output and can be
+        applied by op's kernel as a post-op, or None.
+        """
+        output_decl = self.get_exop(op).output_decls[0]
+        if output_decl.tensor_decl.is_output or len(output_decl.user_input_decls) != 1:
+            return None
+        relu_exop = next(iter(output_decl.user_input_decls)).exop
+        relu_op = relu_exop.op
+        if not isinstance(relu_op, ReluOp) or relu_op.slope != 0 or \
+                relu_op.dtype.type != np.float32:
+            return None
+        # The relu users take over the convolution output, so all views must agree
+        conv_td = output_decl.tensor_description
+        for td in (relu_exop.input_decls[0].tensor_description,
+                   relu_exop.output_decls[0].tensor_description):
+            if (td.dtype != conv_td.dtype or td.shape != conv_td.shape or
+                    td.strides != conv_td.strides or td.offset != conv_td.offset):
+                return None
+        return relu_exop
+
     def replace_exop(self, new_op, old_op, index=0):
         """
         1) Replace old_op's output decl with a new output_decl from new_op
@@ -306,7 +467,8 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
         weights_shape = [gamma_shape, bias_shape]
 
         op_id = len(self.mkldnn.kernels)
-        self.mkldnn.kernels[op.safe_name] = self.mkldnn.create_empty_kernel(op_id)
+        kernel = self.mkldnn.create_empty_kernel(op_id)
+        self.mkldnn.kernels[op.safe_name] = kernel
 
         self.mkldnn.batchnorm_fprop_kernel(
             self.mkldnn.mkldnn_engine,
@@ -324,8 +486,7 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
             inputs_layout,
             None,
             data_type,
-            self.mkldnn.kernels[
-                op.safe_name])
+            kernel)
 
         out_axes = get_axes_mkl_order(op.axes, mkl_order)
         self.set_mkl_layout(op, out_axes)
@@ -372,7 +533,8 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
         variance_layout = None
 
         op_id = len(self.mkldnn.kernels)
-        self.mkldnn.kernels[op.safe_name] = self.mkldnn.create_empty_kernel(op_id)
+        kernel = self.mkldnn.create_empty_kernel(op_id)
+        self.mkldnn.kernels[op.safe_name] = kernel
 
         self.mkldnn.batchnorm_bprop_kernel(
             self.mkldnn.mkldnn_engine,
@@ -395,8 +557,7 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
             data_type,
             self.mkldnn.kernels[
                 op.fprop.forwarded.safe_name],
-            self.mkldnn.kernels[
-                op.safe_name])
+            kernel)
 
         self.set_mkl_layout(op, out_axes)
         dbg_print_kernel(self.mkldnn, op, op_id)
@@ -405,39 +566,49 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
         self.replace_exop(op, dgamma)
         self.replace_exop(op, dbeta)
 
-    @visit.on_type(ConvolutionOp)
-    def visit(self, op, input, filter, bias=None):
-
+    def is_supported_conv(self, op, input):
         # Only 2D convolution supported in MKLDNN for now
-        if (input.axes[1].length != 1):
-            return
         # Only single precision float supported for now
-        if (op.dtype.type != np.float32):
+        return input.axes[1].length == 1 and op.dtype.type == np.float32
+
+    def is_supported_pool(self, op, input):
+        # Only 2D pooling over (C, D, H, W, N) supported in MKLDNN for now
+        pool_params = op.pool_params
+        return (self.is_supported_conv(op, input) and
+                pool_params['J'] == 1 and pool_params['T'] == 1 and
+                len(op.axes) == 5)
+
+    def get_conv_params(self, op):
+        """
+        Strides, padding and dilation of a 2D convolution as MKL-DNN kernel arguments
+        """
+        _, pad_h, pad_w = _PAD_GET(op.conv_params)
+        _, str_h, str_w = _STR_GET(op.conv_params)
+        _, dil_h, dil_w = _DIL_GET(op.conv_params)
+        return (get_ctypes_arg([str_h, str_w]),
+                get_ctypes_arg([pad_h, pad_w]),
+                get_ctypes_arg([dil_h - 1, dil_w - 1]))
+
+    @visit.on_type(ConvolutionOp)
+    def visit(self, op, input, filter, bias=None):
+        if not self.is_supported_conv(op, input):
             return
 
         data_type = self.mkldnn.datatype[op.dtype.type]
-        # Assumes (C, D, H, W, N) for convolution axes and (I, D, H, W, O) for
-        # filter axes
-
         (input_shape, input_layout) = self.get_arg_shape_and_layout(
-            op, input, [4, 0, 2, 3])
+            op, input, _CONV_MKL_ORDER)
         (filter_shape, filter_layout) = self.get_arg_shape_and_layout(
-            op, filter, [4, 0, 2, 3])
+            op, filter, _CONV_MKL_ORDER)
         bias_shape = get_size_mkl_order(bias.axes, [0]) if bias else None
-        output_shape = get_size_mkl_order(op.axes, [4, 0, 2, 3])
-        out_axes = get_axes_mkl_order(op.axes, [4, 0, 2, 3])
-        pad_d, pad_h, pad_w = itemgetter(
-            *('pad_' + s for s in ('d', 'h', 'w')))(op.conv_params)
-        str_d, str_h, str_w = itemgetter(
-            *('str_' + s for s in ('d', 'h', 'w')))(op.conv_params)
-        dil_d, dil_h, dil_w = itemgetter(
-            *('dil_' + s for s in ('d', 'h', 'w')))(op.conv_params)
-        pad = [pad_h, pad_w]
-        stride = [str_h, str_w]
-        dilation = [dil_h - 1, dil_w - 1]
+        output_shape = get_size_mkl_order(op.axes, _CONV_MKL_ORDER)
+        out_axes = get_axes_mkl_order(op.axes, _CONV_MKL_ORDER)
+        stride, pad, dilation = self.get_conv_params(op)
+
+        relu_exop = self.get_fusible_relu(op)
 
         op_id = len(self.mkldnn.kernels)
-        self.mkldnn.kernels[op.safe_name] = self.mkldnn.create_empty_kernel(op_id)
+        kernel = self.mkldnn.create_empty_kernel(op_id)
+        self.mkldnn.kernels[op.safe_name] = kernel
         self.mkldnn.conv_fprop_kernel(
             self.mkldnn.mkldnn_engine,
             len(input_shape),
@@ -448,48 +619,36 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
             get_ctypes_arg(filter_shape),
             get_ctypes_arg(bias_shape),
             get_ctypes_arg(output_shape),
-            get_ctypes_arg(stride),
-            get_ctypes_arg(pad),
-            get_ctypes_arg(dilation),
+            stride, pad, dilation,
             input_layout,
             filter_layout,
+            1 if relu_exop else 0,
             data_type,
-            self.mkldnn.kernels[
-                op.safe_name])
+            kernel)
+        if relu_exop:
+            # The kernel applies the relu, so its users read the convolution output
+            self.fused_relus[relu_exop] = self.get_exop(op)
 
         self.set_mkl_layout(op, out_axes)
         dbg_print_kernel(self.mkldnn, op, op_id)
 
     @visit.on_type(bprop_conv)
     def visit(self, op, input, filter):
-        # Only 2D convolution supported in MKLDNN for now
-        if (input.axes[1].length != 1):
-            return
-        # Only single precision float supported for now
-        if (op.dtype.type != np.float32):
+        if not self.is_supported_conv(op, input):
             return
 
         data_type = self.mkldnn.datatype[op.dtype.type]
-        # Assumes (C, D, H, W, N) for convolution axes and (I, D, H, W, O) for
-        # filter axes
         (input_shape, input_layout) = self.get_arg_shape_and_layout(
-            op, input, [4, 0, 2, 3])
+            op, input, _CONV_MKL_ORDER)
         (filter_shape, filter_layout) = self.get_arg_shape_and_layout(
-            op, filter, [4, 0, 2, 3])
-        output_shape = get_size_mkl_order(op.axes, [4, 0, 2, 3])
-        out_axes = get_axes_mkl_order(op.axes, [4, 0, 2, 3])
-        pad_d, pad_h, pad_w = itemgetter(
-            *('pad_' + s for s in ('d', 'h', 'w')))(op.conv_params)
-        str_d, str_h, str_w = itemgetter(
-            *('str_' + s for s in ('d', 'h', 'w')))(op.conv_params)
-        dil_d, dil_h, dil_w = itemgetter(
-            *('dil_' + s for s in ('d', 'h', 'w')))(op.conv_params)
-        pad = [pad_h, pad_w]
-        stride = [str_h, str_w]
-        dilation = [dil_h - 1, dil_w - 1]
+            op, filter, _CONV_MKL_ORDER)
+        output_shape = get_size_mkl_order(op.axes, _CONV_MKL_ORDER)
+        out_axes = get_axes_mkl_order(op.axes, _CONV_MKL_ORDER)
+        stride, pad, dilation = self.get_conv_params(op)
 
         op_id = len(self.mkldnn.kernels)
-        self.mkldnn.kernels[op.safe_name] = self.mkldnn.create_empty_kernel(op_id)
+        kernel = self.mkldnn.create_empty_kernel(op_id)
+        self.mkldnn.kernels[op.safe_name] = kernel
         self.mkldnn.conv_bprop_kernel(
             self.mkldnn.mkldnn_engine,
             len(input_shape),
@@ -498,51 +657,41 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
             get_ctypes_arg(input_shape),
             get_ctypes_arg(filter_shape),
             get_ctypes_arg(output_shape),
-            get_ctypes_arg(stride),
-            get_ctypes_arg(pad),
-            get_ctypes_arg(dilation),
+            stride, pad, dilation,
             input_layout,
             filter_layout,
             data_type,
-            self.mkldnn.kernels[
-                op.safe_name])
+            kernel)
 
         self.set_mkl_layout(op, out_axes)
         dbg_print_kernel(self.mkldnn, op, op_id)
 
     @visit.on_type(update_conv)
     def visit(self, op, delta, inputs, dbias=None):
-        # Only 2D convolution supported in MKLDNN for now
-        if (delta.axes[1].length != 1):
-            return
-        # Only single precision float supported for now
-        if (op.dtype.type != np.float32):
+        if not self.is_supported_conv(op, delta):
             return
 
         data_type = self.mkldnn.datatype[op.dtype.type]
-        # Assumes (C, D, H, W, N) for convolution axes and (I, D, H, W, O) for
-        # filter axes
         (delta_shape, delta_layout) = self.get_arg_shape_and_layout(
-            op, delta, [4, 0, 2, 3])
+            op, delta, _CONV_MKL_ORDER)
         (inputs_shape, inputs_layout) = self.get_arg_shape_and_layout(
-            op, inputs, [4, 0, 2, 3])
-        # Output
-        (filter_shape, filter_layout) = self.get_op_shape_and_layout(
-            op, [4, 0, 2, 3], 0)
+            op, inputs, _CONV_MKL_ORDER)
+        # Output. A dense CTRSK filter is the kernel's default ihwo layout, so
+        # it does not need a native layout object
+        exop = self.get_exop(op)
+        if exop.output_decls[0].tensor_description.c_contiguous:
+            filter_shape = get_size_mkl_order(op.axes, _CONV_MKL_ORDER)
+            filter_layout = None
+        else:
+            (filter_shape, filter_layout) = self.get_op_shape_and_layout(
+                op, _CONV_MKL_ORDER, 0, exop)
         (bias_shape, _) = self.get_op_shape_and_layout(
             op.dbias, [0], 0) if dbias else (None, None)
-        pad_d, pad_h, pad_w = itemgetter(
-            *('pad_' + s for s in ('d', 'h', 'w')))(op.conv_params)
-        str_d, str_h, str_w = itemgetter(
-            *('str_' + s for s in ('d', 'h', 'w')))(op.conv_params)
-        dil_d, dil_h, dil_w = itemgetter(
-            *('dil_' + s for s in ('d', 'h', 'w')))(op.conv_params)
-        pad = [pad_h, pad_w]
-        stride = [str_h, str_w]
-        dilation = [dil_h - 1, dil_w - 1]
+        stride, pad, dilation = self.get_conv_params(op)
 
         op_id = len(self.mkldnn.kernels)
-        self.mkldnn.kernels[op.safe_name] = self.mkldnn.create_empty_kernel(op_id)
+        kernel = self.mkldnn.create_empty_kernel(op_id)
+        self.mkldnn.kernels[op.safe_name] = kernel
         self.mkldnn.update_conv_kernel(
             self.mkldnn.mkldnn_engine,
             len(delta_shape),
@@ -553,15 +702,12 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
             get_ctypes_arg(filter_shape),
             get_ctypes_arg(bias_shape),
             get_ctypes_arg(inputs_shape),
-            get_ctypes_arg(stride),
-            get_ctypes_arg(pad),
-            get_ctypes_arg(dilation),
+            stride, pad, dilation,
             delta_layout,
             filter_layout,
             inputs_layout,
             data_type,
-            self.mkldnn.kernels[
-                op.safe_name])
+            kernel)
         # Output is in ngraph layout. We dont need set_mkl_layout
         dbg_print_kernel(self.mkldnn, op, op_id)
 
@@ -573,30 +719,37 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
     def visit(self, op, input):
         if (op.dtype.type != np.float32):
             return
+        exop = self.get_exop(op)
+        if exop in self.fused_relus:
+            # The convolution kernel applies the relu, so the value keeps the convolution
+            # layout for the MKL ops downstream until the exops are merged
+            conv_exop = self.fused_relus[exop]
+            exop.output_decls[0].tensor_view_decl.mkl_layout = \
+                conv_exop.output_decls[0].tensor_view_decl.mkl_layout
+            return
         data_type = self.mkldnn.datatype[op.dtype.type]
-        arg_idx = get_arg_output_idx(self.get_exop(op), self.get_exop(input))
-        mkl_layout = self.get_exop(input).output_decls[
-            arg_idx].tensor_view_decl.mkl_layout
+        mkl_layout = self.get_arg_mkl_layout(op, input)
         if mkl_layout:
             # Keep the axes order so we propagate the layout instead of
             # creating a new layout
             (_, input_axes) = mkl_layout
             mkl_order = get_order_from_axes(op.axes, input_axes)
         else:
-            mkl_order = list(range(len(op.axes)))
+            mkl_order = self.get_natural_order(op.axes)
         (input_shape, input_layout) = self.get_arg_shape_and_layout(
             op, input, mkl_order)
         out_axes = get_axes_mkl_order(op.axes, mkl_order)
 
         input_size = np.prod(input.axes.lengths)
         op_id = len(self.mkldnn.kernels)
-        self.mkldnn.kernels[op.safe_name] = self.mkldnn.create_empty_kernel(op_id)
+        kernel = self.mkldnn.create_empty_kernel(op_id)
+        self.mkldnn.kernels[op.safe_name] = kernel
         self.mkldnn.relu_fprop_kernel(
             self.mkldnn.mkldnn_engine,
             input_size, op.slope,
             input_layout,
             data_type,
-            self.mkldnn.kernels[op.safe_name])
+            kernel)
 
         self.set_mkl_layout(op, out_axes)
         dbg_print_kernel(self.mkldnn, op, op_id)
@@ -608,15 +761,13 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
 
         data_type = self.mkldnn.datatype[op.dtype.type]
 
-        arg_idx = get_arg_output_idx(self.get_exop(op), self.get_exop(delta))
-        mkl_layout = self.get_exop(delta).output_decls[
-            arg_idx].tensor_view_decl.mkl_layout
+        mkl_layout = self.get_arg_mkl_layout(op, delta)
         if mkl_layout:
             (_, input_axes) = mkl_layout
             mkl_order = get_order_from_axes(op.axes, input_axes)
         else:
             # Note: For relu, order need not be in [N, C, H, W]
-            mkl_order = list(range(len(op.axes)))
+            mkl_order = self.get_natural_order(op.axes)
         (delta_shape, delta_layout) = self.get_arg_shape_and_layout(
             op, delta, mkl_order)
         (fprop_src_shape, fprop_src_layout) = self.get_arg_shape_and_layout(
@@ -625,29 +776,21 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
 
         input_size = np.prod(delta.axes.lengths)
         op_id = len(self.mkldnn.kernels)
-        self.mkldnn.kernels[op.safe_name] = self.mkldnn.create_empty_kernel(op_id)
+        kernel = self.mkldnn.create_empty_kernel(op_id)
+        self.mkldnn.kernels[op.safe_name] = kernel
         self.mkldnn.relu_bprop_kernel(
             self.mkldnn.mkldnn_engine,
             input_size, op.fprop.forwarded.slope,
             fprop_src_layout, delta_layout,
             data_type,
-            self.mkldnn.kernels[op.safe_name])
+            kernel)
 
         self.set_mkl_layout(op, out_axes)
         dbg_print_kernel(self.mkldnn, op, op_id)
 
     @visit.on_type(PoolingOp)
     def visit(self, op, input):
-        # Only 2D pooling supported in MKLDNN for now
-        if (input.axes[1].length != 1):
-            return
-        if (op.pool_params['J'] != 1 or op.pool_params['T'] != 1):
-            return
-        # Only single precision float supported for now
-        if op.dtype != np.float32:
-            return
-        # Sanity check tensor shapes
-        if (len(op.axes.lengths) != 5):
+        if not self.is_supported_pool(op, input):
             return
 
         data_type = self.mkldnn.datatype[op.dtype.type]
@@ -657,10 +800,8 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
         output_shape = get_size_mkl_order(op.axes, [4, 0, 2, 3])
         out_axes = get_axes_mkl_order(op.axes, [4, 0, 2, 3])
         kernel = [op.pool_params['R'], op.pool_params['S']]
-        pad_d, pad_h, pad_w = itemgetter(
-            *('pad_' + s for s in ('d', 'h', 'w')))(op.pool_params)
-        str_d, str_h, str_w = itemgetter(
-            *('str_' + s for s in ('d', 'h', 'w')))(op.pool_params)
+        pad_d, pad_h, pad_w = _PAD_GET(op.pool_params)
+        str_d, str_h, str_w = _STR_GET(op.pool_params)
         pad = [pad_h, pad_w]
         stride = [str_h, str_w]
         op_type = op.pool_params
@@ -669,7 +810,8 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
             pool_type = 1
 
         op_id = len(self.mkldnn.kernels)
-        self.mkldnn.kernels[op.safe_name] = self.mkldnn.create_empty_kernel(op_id)
+        kernel = self.mkldnn.create_empty_kernel(op_id)
+        self.mkldnn.kernels[op.safe_name] = kernel
         self.mkldnn.pool_fprop_kernel(
             self.mkldnn.mkldnn_engine,
             len(input_shape),
@@ -682,24 +824,14 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
             pool_type,
             input_layout,
             data_type,
-            self.mkldnn.kernels[
-                op.safe_name])
+            kernel)
 
         self.set_mkl_layout(op, out_axes)
         dbg_print_kernel(self.mkldnn, op, op_id)
 
     @visit.on_type(BpropPoolOp)
     def visit(self, op, input):
-        # Only 2D pooling supported in MKLDNN for now
-        if (input.axes[1].length != 1):
-            return
-        if (op.pool_params['J'] != 1 or op.pool_params['T'] != 1):
-            return
-        # Only single precision float supported for now
-        if op.dtype != np.float32:
-            return
-        # Sanity check tensor shapes
-        if (len(op.axes.lengths) != 5):
+        if not self.is_supported_pool(op, input):
             return
 
         if op.fprop.forwarded.safe_name not in self.mkldnn.kernels:
@@ -712,10 +844,8 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
         output_shape = get_size_mkl_order(op.axes, [4, 0, 2, 3])
         out_axes = get_axes_mkl_order(op.axes, [4, 0, 2, 3])
         kernel = [op.pool_params['R'], op.pool_params['S']]
-        pad_d, pad_h, pad_w = itemgetter(
-            *('pad_' + s for s in ('d', 'h', 'w')))(op.pool_params)
-        str_d, str_h, str_w = itemgetter(
-            *('str_' + s for s in ('d', 'h', 'w')))(op.pool_params)
+        pad_d, pad_h, pad_w = _PAD_GET(op.pool_params)
+        str_d, str_h, str_w = _STR_GET(op.pool_params)
         pad = [pad_h, pad_w]
         stride = [str_h, str_w]
         op_type = op.pool_params
@@ -724,7 +854,8 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
             pool_type = 1
 
         op_id = len(self.mkldnn.kernels)
-        self.mkldnn.kernels[op.safe_name] = self.mkldnn.create_empty_kernel(op_id)
+        kernel = self.mkldnn.create_empty_kernel(op_id)
+        self.mkldnn.kernels[op.safe_name] = kernel
         self.mkldnn.pool_bprop_kernel(
             self.mkldnn.mkldnn_engine,
             len(input_shape),
@@ -739,8 +870,7 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
             data_type,
             self.mkldnn.kernels[
                 op.fprop.forwarded.safe_name],
-            self.mkldnn.kernels[
-                op.safe_name])
+            kernel)
 
         self.set_mkl_layout(op, out_axes)
         dbg_print_kernel(self.mkldnn, op, op_id)
@@ -752,7 +882,7 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
         if (len(x.axes.lengths) != 2) or (len(y.axes.lengths) != 2):
             return
         # Only single precision float supported for now
-        if op.dtype != np.float32:
+        if op.dtype.type != np.float32:
             return
 
         (x_shape, x_layout) = self.get_arg_shape_and_layout(op, x, [0, 1])
@@ -765,14 +895,15 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
         data_type = self.mkldnn.datatype[op.dtype.type]
 
         op_id = len(self.mkldnn.kernels)
-        self.mkldnn.kernels[op.safe_name] = self.mkldnn.create_empty_kernel(op_id)
+        kernel = self.mkldnn.create_empty_kernel(op_id)
+        self.mkldnn.kernels[op.safe_name] = kernel
         self.mkldnn.innerproduct_fprop_kernel(
             self.mkldnn.mkldnn_engine,
             len(x_shape), len(y_shape), 1, len(o_shape),
             get_ctypes_arg(x_shape), get_ctypes_arg(y_shape),
             get_ctypes_arg(bias_shape), get_ctypes_arg(o_shape),
             x_layout, y_layout, bias_layout,
-            data_type, self.mkldnn.kernels[op.safe_name])
+            data_type, kernel)
 
         out_axes = get_axes_mkl_order(op.axes, [1, 0])
         self.set_mkl_layout(op, out_axes)
@@ -789,13 +920,11 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
         # if len(x.shape) != 5 or len(y.shape) != 5:
         #    return
 
-        arg_idx = get_arg_output_idx(self.get_exop(op), self.get_exop(x))
-        if self.get_exop(x).output_decls[
-                arg_idx].tensor_view_decl.mkl_layout is None:
+        mkl_layout = self.get_arg_mkl_layout(op, x)
+        if mkl_layout is None:
             return
 
-        (_, input_axes) = self.get_exop(x).output_decls[
-            arg_idx].tensor_view_decl.mkl_layout
+        (_, input_axes) = mkl_layout
         mkl_order = get_order_from_axes(op.axes, input_axes)
         data_type = self.mkldnn.datatype[op.dtype.type]
         (x_shape, x_layout) = self.get_arg_shape_and_layout(op, x, mkl_order)
@@ -803,20 +932,56 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
         out_shape = op.axes.lengths
 
         op_id = len(self.mkldnn.kernels)
-        self.mkldnn.kernels[op.safe_name] = self.mkldnn.create_empty_kernel(op_id)
+        kernel = self.mkldnn.create_empty_kernel(op_id)
+        self.mkldnn.kernels[op.safe_name] = kernel
+        # shapes owns the memory the shape arguments point to until add_kernel returns
+        (shapes, (x_shape_arg, y_shape_arg, out_shape_arg)) = get_packed_ctypes_args(
+            x_shape, y_shape, out_shape)
         self.mkldnn.add_kernel(
             self.mkldnn.mkldnn_engine,
             len(x_shape), len(y_shape), len(out_shape),
-            get_ctypes_arg(x_shape), get_ctypes_arg(y_shape),
-            get_ctypes_arg(out_shape),
+            x_shape_arg, y_shape_arg, out_shape_arg,
             x_layout, y_layout,
             2,
-            data_type, self.mkldnn.kernels[op.safe_name])
+            data_type, kernel)
 
         out_axes = get_axes_mkl_order(op.axes, mkl_order)
         self.set_mkl_layout(op, out_axes)
         dbg_print_kernel(self.mkldnn, op, op_id)
 
+    @visit.on_type(ElementWiseOp)
+    def visit(self, op, *args):
+        # Elementwise ops compute element by element. When all operands that are not
+        # broadcast scalars are laid out like the op's value and hold one MKL layout, the
+        # value is computed in that MKL layout and no reorders are needed
+        exop = self.get_exop(op)
+        op_td = exop.output_decls[0].tensor_description
+        if not op_td.c_contiguous or op_td.offset != 0:
+            return
+        mkl_layout = None
+        for input_decl in exop.input_decls:
+            td = input_decl.tensor_description
+            arg_layout = input_decl.source_output_decl.tensor_view_decl.mkl_layout
+            if arg_layout is None:
+                if any(td.strides):
+                    return
+                continue
+            if (td.dtype != op_td.dtype or td.shape != op_td.shape or
+                    td.strides != op_td.strides or td.offset != 0 or
+                    td.axes.names != op_td.axes.names):
+                return
+            if mkl_layout is None:
+                mkl_layout = arg_layout
+            elif (arg_layout[1] != mkl_layout[1] or
+                    not self.mkldnn.cmp_layouts(arg_layout[0], mkl_layout[0])):
+                return
+        if mkl_layout is None:
+            return
+        (layout, mkl_axes) = mkl_layout
+        order = get_order_from_axes(op.axes, mkl_axes)
+        exop.output_decls[0].tensor_view_decl.mkl_layout = (
+            layout, get_axes_mkl_order(op.axes, order))
+
     @visit.on_type(ContiguousOp)
     def visit(self, op, arg):
         mkl_layout = self.get_arg_mkl_layout(op, arg)
@@ -834,14 +999,14 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
             (out_shape, out_layout) = self.get_op_shape_and_layout(op, order, 0)
 
             op_id = len(self.mkldnn.kernels)
-            self.mkldnn.kernels[
-                op.safe_name] = self.mkldnn.create_empty_kernel(op_id)
+            kernel = self.mkldnn.create_empty_kernel(op_id)
+            self.mkldnn.kernels[op.safe_name] = kernel
             self.mkldnn.reorder_kernel(
                 self.mkldnn.mkldnn_engine,
                 ndims, get_ctypes_arg(in_shape),
                 self.mkldnn.datatype[op.dtype.type],
                 in_layout, out_layout,
-                self.mkldnn.kernels[op.safe_name]
+                kernel
             )
             dbg_print_kernel(self.mkldnn, op, op_id)
 
@@ -916,7 +1081,7 @@ class MklAddLayoutConversions(PeepholeGraphPass):
     def __init__(self, mkldnn, **kwargs):
         super(MklAddLayoutConversions, self).__init__(**kwargs)
         self.mkldnn = mkldnn
-        self.reorder_ops = dict()   # Maps op.safe_name to reorder op
+        self.reorder_ops = dict()   # Maps op to reorder op
 
     def init_mkldnn_reorder(self, op):
         (mkl_layout, mkl_axes) = op.in_layout
@@ -928,19 +1093,21 @@ class MklAddLayoutConversions(PeepholeGraphPass):
         ndims = len(mkl_axes)
         dims = get_size_mkl_order(op.axes, mkl_axes_order)
         op_id = len(self.mkldnn.kernels)
-        self.mkldnn.kernels[op.safe_name] = self.mkldnn.create_empty_kernel(op_id)
+        kernel = self.mkldnn.create_empty_kernel(op_id)
+        self.mkldnn.kernels[op.safe_name] = kernel
         self.mkldnn.reorder_kernel(
             self.mkldnn.mkldnn_engine,
             ndims, get_ctypes_arg(dims),
             self.mkldnn.datatype[op.dtype.type],
             mkl_layout, out_layout,
-            self.mkldnn.kernels[op.safe_name]
+            kernel
         )
         dbg_print_kernel(self.mkldnn, op, op_id)
 
     def get_reorder_op(self, op):
-        if op.safe_name in self.reorder_ops:
-            return self.reorder_ops[op.safe_name]
+        reorder_op = self.reorder_ops.get(op)
+        if reorder_op is not None:
+            return reorder_op
         else:
             mkl_layout = self.get_exop(op).output_decls[
                 0].tensor_view_decl.mkl_layout
@@ -951,7 +1118,7 @@ class MklAddLayoutConversions(PeepholeGraphPass):
             if hasattr(op, 'metadata'):
                 reorder_op.metadata = op.metadata
 
-            self.reorder_ops[op.safe_name] = reorder_op
+            self.reorder_ops[op] = reorder_op
             self.init_mkldnn_reorder(reorder_op)
             return reorder_op
 
@@ -959,9 +1126,19 @@ class MklAddLayoutConversions(PeepholeGraphPass):
         return self.op_accessor.computation_decl.get_exop(op)
 
     def get_arg_mkl_layout(self, op, arg):
-        arg_idx = get_arg_output_idx(self.get_exop(op), self.get_exop(arg))
-        return self.get_exop(arg).output_decls[
-            arg_idx].tensor_view_decl.mkl_layout
+        arg_exop = self.get_exop(arg)
+        arg_idx = get_arg_output_idx(self.get_exop(op), arg_exop)
+        return arg_exop.output_decls[arg_idx].tensor_view_decl.mkl_layout
+
+    def needs_reorder(self, op, layout):
+        """
+        True if the MKL layout of op's value differs from the native layout of op
+        """
+        (mkl_layout, mkl_axes) = layout
+        mkl_order = get_order_from_axes(op.axes, mkl_axes)
+        (native_layout, _) = get_native_layout(
+            self.mkldnn, op.tensor_description(), mkl_order)
+        return not self.mkldnn.cmp_layouts(mkl_layout, native_layout)
 
     def is_mkl_pass_through(self, op):
         if isinstance(
@@ -971,7 +1148,8 @@ class MklAddLayoutConversions(PeepholeGraphPass):
              TensorSliceOp,
              ExpandDims,
              ReorderAxes,
-             ContiguousOp)) and \
+             ContiguousOp,
+             ElementWiseOp)) and \
                 self.get_exop(op).output_decls[0].tensor_view_decl.mkl_layout is not None:
             return True
         else:
@@ -987,11 +1165,7 @@ class MklAddLayoutConversions(PeepholeGraphPass):
         for arg in args:
             layout = self.get_arg_mkl_layout(op, arg)
             if layout is not None:
-                (mkl_layout, mkl_axes) = layout
-                mkl_order = get_order_from_axes(arg.axes, mkl_axes)
-                (native_layout, _) = get_native_layout(
-                    self.mkldnn, arg.tensor_description(), mkl_order)
-                if not self.mkldnn.cmp_layouts(mkl_layout, native_layout):
+                if self.needs_reorder(arg, layout):
                     reorder_op = self.get_reorder_op(arg)
                     new_args.append(reorder_op)
                     replace = True
@@ -1026,8 +1200,9 @@ class MklAddLayoutConversions(PeepholeGraphPass):
         return_exop = self.get_exop(op)
         for i, input_decl in enumerate(return_exop.input_decls):
             mkl_layout = input_decl.source_output_decl.tensor_view_decl.mkl_layout
-            if mkl_layout is not None:
-                input_op = input_decl.source_output_decl.exop.op
+            input_op = input_decl.source_output_decl.exop.op
+            # Values already in native layout are returned without a reorder
+            if mkl_layout is not None and self.needs_reorder(input_op, mkl_layout):
                 input_exop = input_decl.source_output_decl.exop
                 reorder_op = self.get_reorder_op(input_op)
                 self.op_accessor.computation_decl.exop_block.add_ops(
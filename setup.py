@@ -65,6 +65,11 @@ class build_ext(_build_ext):
 ext_modules = []
 if "MKLDNN_ROOT" in os.environ:
     MKLDNNROOT=os.environ['MKLDNN_ROOT']
+    # Convolutions apply fused relus through primitive attributes, added in MKL-DNN v0.11
+    with open(os.path.join(MKLDNNROOT, 'include', 'mkldnn.h')) as mkldnn_header:
+        if 'mkldnn_primitive_desc_create_v2' not in mkldnn_header.read():
+            raise RuntimeError("MKL-DNN v0.11 or newer is required, "
+                               "found an older version in {}".format(MKLDNNROOT))
     if sys.platform == 'darwin':
         extra_link_args = ["-Wl,-rpath,%s/lib"%(MKLDNNROOT)]
     else:
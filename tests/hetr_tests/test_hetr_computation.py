@@ -0,0 +1,69 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+import pytest
+
+import ngraph as ng
+from ngraph.transformers.hetrtransform import _map_result_slots, _ChunkStream
+
+pytestmark = pytest.mark.hetr_only
+
+
+class ChildComputation(object):
+    """
+    Stands in for an RPCComputationClient, mapping returned ops to result positions.
+    """
+
+    def __init__(self, returns):
+        self.returns = returns
+
+
+def test_map_result_slots():
+    x, y, z = [ng.placeholder(()) for _ in range(3)]
+    child0 = ChildComputation({x: 0, z: 1})
+    child1 = ChildComputation({y: 0})
+
+    # z is returned twice and fills both of its slots
+    _map_result_slots([x, y, z, z], [child0, child1])
+
+    assert sorted(child0.result_slots) == [(0, 0), (2, 1), (3, 1)]
+    assert child1.result_slots == [(1, 0)]
+
+
+def test_map_result_slots_missing_return():
+    x, y = ng.placeholder(()), ng.placeholder(())
+    child = ChildComputation({x: 0})
+
+    with pytest.raises(ValueError):
+        _map_result_slots([x, y], [child])
+
+
+def failing_chunks():
+    yield 0
+    yield 1
+    raise ValueError('serialization failed')
+
+
+def test_chunk_stream_producer_error():
+    stream = _ChunkStream(failing_chunks())
+    # every consumer gets the chunks produced before the error, then the error
+    for _ in range(2):
+        consumed = []
+        with pytest.raises(ValueError):
+            for chunk in stream:
+                consumed.append(chunk)
+        assert consumed == [0, 1]
+    with pytest.raises(ValueError):
+        stream.join()
@@ -185,6 +185,41 @@ def test_repeat_computation(hetr_device, config):
             np.testing.assert_array_equal(res2, np_x + 1)
 
 
+@pytest.mark.multi_device
+def test_send_recv_combined(hetr_device):
+    """
+    Sends small and large tensors both ways between two devices. Small sends that
+    directly follow each other to the same peer go out as a single combined message,
+    the large tensor is bigger than the default HETR_SEND_COMBINE_BYTES and is sent
+    on its own or at the end of a combined message.
+    """
+    if hetr_device == 'gpu':
+        pytest.skip('combined sends are only used by cpu mlsl send and recv.')
+    # 128KB of float32, twice the default SEND_COMBINE_BYTES
+    ax_big = ng.make_axis(32 * 1024)
+
+    with ng.metadata(device=hetr_device):
+        x = ng.placeholder(axes=[ax_A])
+        big = ng.placeholder(axes=[ax_big])
+        with ng.metadata(device_id='1'):
+            x_plus_one = x + 1
+            x_times_two = x * 2
+            x_minus_one = x - 1
+            big_plus_one = big + 1
+        small_sum = x_plus_one + x_times_two + x_minus_one
+        big_twice = big_plus_one * 2
+
+    np_x = np.random.randint(100, size=ax_A.length)
+    np_big = np.random.randint(100, size=ax_big.length)
+    with closing(ngt.make_transformer_factory('hetr', device=hetr_device)()) as transformer:
+        computation = transformer.computation([small_sum, big_twice], x, big)
+        # run twice, nothing received in the first call may leak into the second
+        for i in range(2):
+            small_res, big_res = computation(np_x + i, np_big + i)
+            np.testing.assert_array_equal(small_res, 4 * (np_x + i))
+            np.testing.assert_array_equal(big_res, 2 * (np_big + i + 1))
+
+
 @pytest.mark.multi_device
 def test_comm_broadcast_op(hetr_device):
     if hetr_device == 'gpu':
@@ -0,0 +1,134 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip('aeon')
+from ngraph.frontends.neon.aeon_shim import _BatchBuffers, _PrefetchIterator  # noqa
+
+
+class ListLoader(object):
+    """
+    Stands in for an aeon DataLoader, returning batches of (name, array) pairs from a list.
+    An exception in the list is raised instead of being returned.
+    """
+
+    def __init__(self, batches):
+        self.batches = batches
+        self.index = 0
+        self.resets = 0
+
+    def __next__(self):
+        if self.index >= len(self.batches):
+            raise StopIteration
+        batch = self.batches[self.index]
+        self.index += 1
+        if isinstance(batch, Exception):
+            raise batch
+        return batch
+
+    next = __next__
+
+    def reset(self):
+        self.index = 0
+        self.resets += 1
+
+
+def make_batches(count):
+    return [[('image', np.full((2, 3), i, dtype=np.float32)),
+             ('label', np.full((2, 1), i, dtype=np.int32))] for i in range(count)]
+
+
+def identity(batch):
+    return batch
+
+
+def batch_id(batch):
+    return int(dict(batch)['image'][0, 0])
+
+
+def test_prefetch_order():
+    prefetcher = _PrefetchIterator(ListLoader(make_batches(5)), identity, 2)
+    assert [batch_id(next(prefetcher)) for _ in range(5)] == list(range(5))
+    with pytest.raises(StopIteration):
+        next(prefetcher)
+    # the end of the data stays reported
+    with pytest.raises(StopIteration):
+        next(prefetcher)
+    prefetcher.close()
+
+
+def test_prefetch_reset():
+    loader = ListLoader(make_batches(5))
+    prefetcher = _PrefetchIterator(loader, identity, 2)
+    assert batch_id(next(prefetcher)) == 0
+    assert batch_id(next(prefetcher)) == 1
+    prefetcher.reset()
+    assert loader.resets == 1
+    assert [batch_id(next(prefetcher)) for _ in range(5)] == list(range(5))
+    prefetcher.close()
+
+
+def test_prefetch_worker_exception():
+    batches = make_batches(3)
+    batches[1] = ValueError('bad batch')
+    prefetcher = _PrefetchIterator(ListLoader(batches), identity, 2)
+    assert batch_id(next(prefetcher)) == 0
+    with pytest.raises(ValueError):
+        next(prefetcher)
+    # the error stays reported instead of blocking on the empty queue
+    with pytest.raises(ValueError):
+        next(prefetcher)
+    prefetcher.close()
+
+
+def test_prefetch_close_blocked_worker():
+    # the worker fills the queue and then blocks until close() stops it
+    prefetcher = _PrefetchIterator(ListLoader(make_batches(10)), identity, 1)
+    assert batch_id(next(prefetcher)) == 0
+    closer = threading.Thread(target=prefetcher.close)
+    closer.start()
+    closer.join(5)
+    assert not closer.is_alive()
+    assert not prefetcher._thread.is_alive()
+
+
+def test_batch_buffers_copy():
+    buffers = _BatchBuffers(2, copy_all=True)
+    batches = make_batches(3)
+    first = buffers(batches[0])
+    second = buffers(batches[1])
+    assert first['label'].shape == (2,)
+    assert first['image'] is not second['image']
+    # values are copied out of the loader's arrays
+    batches[1][0][1][...] = -1
+    assert np.all(second['image'] == 1)
+    # the buffer sets are reused in turn
+    third = buffers(batches[2])
+    assert third['image'] is first['image']
+    assert np.all(third['image'] == 2)
+    np.testing.assert_array_equal(third['label'], [2, 2])
+
+
+def test_batch_buffers_view():
+    buffers = _BatchBuffers(1, copy_all=False)
+    batch = make_batches(1)[0]
+    out = buffers(batch)
+    assert np.shares_memory(out['image'], batch[0][1])
+    assert out['label'].shape == (2,)
+    assert np.shares_memory(out['label'], batch[1][1])
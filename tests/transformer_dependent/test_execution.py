@@ -987,6 +987,29 @@ def test_onehot():
     one_hot_comparison(ng.make_axes([C, W, H, N]), ng.make_axes([W, H, N]), C)
 
 
+def test_onehot_axis_orders():
+    """
+    One hot of an input whose axes are reordered, with the result read in yet another
+    axis order.
+    """
+    C = ng.make_axis(length=5)
+    W = ng.make_axis(length=3)
+    N = ng.make_axis(length=8, name='N')
+
+    u = rng.random_integers(0, C.length - 1, ng.make_axes([N, W]), dtype=np.int8)
+    u_p = ng.placeholder(ng.make_axes([N, W]), dtype=u.dtype)
+    # one hot axes are (C, W, N), read back as (N, C, W)
+    hot = ng.one_hot(ng.axes_with_order(u_p, ng.make_axes([W, N])), axis=C)
+    hot_reordered = ng.axes_with_order(hot, ng.make_axes([N, C, W]))
+
+    # numpy one hot with the class axis last, (N, W, C)
+    v = np.eye(C.length, dtype=np.float32)[u]
+    with executor([hot, hot_reordered], u_p) as ex:
+        hot_t, hot_reordered_t = ex(u)
+        ng.testing.assert_allclose(hot_t, v.transpose(2, 1, 0))
+        ng.testing.assert_allclose(hot_reordered_t, v.transpose(0, 2, 1))
+
+
 def test_clip():
     H = ng.make_axis(length=5)
     W = ng.make_axis(length=4)
@@ -0,0 +1,207 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Graphs that exercise the MKL-DNN passes of the CPU transformer. The MKL kernels pick
+blocked layouts for channel counts that are multiples of 8, so the values below only
+come out right when the layouts are tracked across the ops. Without MKL-DNN the same
+graphs run on the numpy kernels and are checked against the same references.
+"""
+import gc
+import weakref
+
+import numpy as np
+import pytest
+
+import ngraph as ng
+from ngraph.frontends.neon import Rectlin
+from ngraph.testing import RandomTensorGenerator, executor, ConvParams, reference_conv
+
+pytestmark = [pytest.mark.transformer_dependent, pytest.mark.separate_execution]
+
+rng = RandomTensorGenerator(0, np.float32)
+
+conv_settings = dict(C=8, N=4, K=16, H=6, W=6, R=3, S=3)
+
+pool_params = dict(pad_c=0, pad_d=0, pad_h=0, pad_w=0,
+                   str_c=1, str_d=1, str_h=2, str_w=2,
+                   J=1, T=1, R=2, S=2, op='max')
+
+
+def conv_values(cf):
+    input_value = rng.uniform(-0.5, 0.5, cf.ax_i)
+    filter_value = rng.uniform(-0.5, 0.5, cf.ax_f)
+    conv_np, _, _ = reference_conv(cf.dimI, cf.dimF, cf.dimO, cf.conv_params,
+                                   input_value, filter_value, np.zeros(cf.dimO))
+    return input_value, filter_value, conv_np
+
+
+def reference_pool(value):
+    # 2x2 max pooling with stride 2 over the H and W axes of a (C, D, H, W, N) array
+    C, D, H, W, N = value.shape
+    return value.reshape(C, D, H // 2, 2, W // 2, 2, N).max(axis=(3, 5))
+
+
+def conv_relu_pool(cf):
+    inputs = ng.placeholder(cf.ax_i)
+    filters = ng.placeholder(cf.ax_f)
+    conv = ng.convolution(cf.conv_params, inputs, filters, axes=cf.ax_o)
+    relu = Rectlin()(conv)
+    ax_p = ng.make_axes([cf.ax_o[0], cf.ax_o[1],
+                         ng.make_axis(name='H', length=cf.ax_o[2].length // 2),
+                         ng.make_axis(name='W', length=cf.ax_o[3].length // 2),
+                         cf.ax_o[4]])
+    pool = ng.pooling(pool_params, relu, axes=ax_p)
+    return pool, conv, inputs, filters
+
+
+def test_conv_relu_pool():
+    """
+    A relu that is the only user of a convolution is applied by the convolution kernel.
+    The pooling after it must read the convolution output in the convolution's layout.
+    """
+    cf = ConvParams(**conv_settings)
+    input_value, filter_value, conv_np = conv_values(cf)
+    pool_np = reference_pool(np.maximum(conv_np, 0))
+
+    # Only user of the convolution, relu is fused
+    pool, _, inputs, filters = conv_relu_pool(cf)
+    with executor(pool, inputs, filters) as fused_executor:
+        fused_ng = fused_executor(input_value, filter_value)
+
+    # The convolution is returned as well, relu is not fused
+    pool, conv, inputs, filters = conv_relu_pool(cf)
+    with executor([pool, conv], inputs, filters) as plain_executor:
+        plain_ng, conv_ng = plain_executor(input_value, filter_value)
+
+    ng.testing.assert_allclose(conv_ng, conv_np, rtol=0, atol=1e-4)
+    ng.testing.assert_allclose(plain_ng, pool_np, rtol=0, atol=1e-4)
+    ng.testing.assert_allclose(fused_ng, plain_ng, rtol=0, atol=1e-5)
+
+
+def test_conv_relu_returned():
+    """
+    A fused relu whose value is returned is converted out of the convolution's layout.
+    """
+    cf = ConvParams(**conv_settings)
+    input_value, filter_value, conv_np = conv_values(cf)
+
+    inputs = ng.placeholder(cf.ax_i)
+    filters = ng.placeholder(cf.ax_f)
+    conv = ng.convolution(cf.conv_params, inputs, filters, axes=cf.ax_o)
+    relu = Rectlin()(conv)
+    with executor(relu, inputs, filters) as relu_executor:
+        relu_ng = relu_executor(input_value, filter_value)
+
+    ng.testing.assert_allclose(relu_ng, np.maximum(conv_np, 0), rtol=0, atol=1e-4)
+
+
+def conv_graph(cf):
+    inputs = ng.placeholder(cf.ax_i)
+    filters = ng.placeholder(cf.ax_f)
+    conv = ng.convolution(cf.conv_params, inputs, filters, axes=cf.ax_o)
+    return conv, inputs, filters
+
+
+def test_unary_elementwise_returned():
+    """
+    A unary elementwise op computes in the convolution's layout, its returned value is
+    converted to the native layout.
+    """
+    cf = ConvParams(**conv_settings)
+    input_value, filter_value, conv_np = conv_values(cf)
+
+    conv, inputs, filters = conv_graph(cf)
+    with executor(ng.tanh(conv), inputs, filters) as tanh_executor:
+        tanh_ng = tanh_executor(input_value, filter_value)
+
+    ng.testing.assert_allclose(tanh_ng, np.tanh(conv_np), rtol=0, atol=1e-4)
+
+
+def test_binary_elementwise_non_mkl_consumer():
+    """
+    A binary elementwise op on two values in the same MKL layout, and on a value and a
+    broadcast scalar, read by a non-MKL reduction and also returned.
+    """
+    cf = ConvParams(**conv_settings)
+    input_value, filter_value, conv_np = conv_values(cf)
+
+    conv, inputs, filters = conv_graph(cf)
+    square = conv * conv
+    scaled = square * 0.5
+    total = ng.sum(scaled, out_axes=())
+    with executor([scaled, total], inputs, filters) as square_executor:
+        scaled_ng, total_ng = square_executor(input_value, filter_value)
+
+    scaled_np = conv_np * conv_np * 0.5
+    ng.testing.assert_allclose(scaled_ng, scaled_np, rtol=0, atol=1e-4)
+    ng.testing.assert_allclose(total_ng, scaled_np.sum(), rtol=1e-4, atol=1e-4)
+
+
+def test_binary_elementwise_mixed_layouts():
+    """
+    A binary elementwise op on a value in an MKL layout and a value in the native layout
+    is computed in the native layout.
+    """
+    cf = ConvParams(**conv_settings)
+    input_value, filter_value, conv_np = conv_values(cf)
+    other_value = rng.uniform(-0.5, 0.5, cf.ax_o)
+
+    conv, inputs, filters = conv_graph(cf)
+    other = ng.placeholder(cf.ax_o)
+    diff = conv - other
+    with executor(ng.exp(diff), inputs, filters, other) as diff_executor:
+        exp_ng = diff_executor(input_value, filter_value, other_value)
+
+    ng.testing.assert_allclose(exp_ng, np.exp(conv_np - other_value), rtol=1e-4, atol=1e-4)
+
+
+def test_binary_elementwise_two_conv_layouts():
+    """
+    A binary elementwise op on the outputs of two convolutions over inputs with different
+    channel counts, which MKL-DNN may lay out differently.
+    """
+    cf_a = ConvParams(**conv_settings)
+    cf_b = ConvParams(**dict(conv_settings, C=3))
+    input_a, filter_a, conv_a_np = conv_values(cf_a)
+    input_b, filter_b, conv_b_np = conv_values(cf_b)
+
+    conv_a, inputs_a, filters_a = conv_graph(cf_a)
+    # both convolutions produce the same output axes
+    conv_b, inputs_b, filters_b = conv_graph(cf_b)
+    product = conv_a * conv_b
+    with executor(product, inputs_a, filters_a, inputs_b, filters_b) as product_executor:
+        product_ng = product_executor(input_a, filter_a, input_b, filter_b)
+
+    ng.testing.assert_allclose(product_ng, conv_a_np * conv_b_np, rtol=0, atol=1e-4)
+
+
+def run_conv_relu_pool(cf, input_value, filter_value):
+    pool, _, inputs, filters = conv_relu_pool(cf)
+    with executor(pool, inputs, filters) as pool_executor:
+        pool_executor(input_value, filter_value)
+    return weakref.ref(pool)
+
+
+def test_closed_transformer_releases_graph():
+    """
+    The MKL-DNN engine caches tensor descriptions, which reference their ops and buffers.
+    Closing the transformer releases them, so the graph is not kept alive.
+    """
+    cf = ConvParams(**conv_settings)
+    input_value, filter_value, _ = conv_values(cf)
+    pool_ref = run_conv_relu_pool(cf, input_value, filter_value)
+    gc.collect()
+    assert pool_ref() is None